@@ -1,33 +1,195 @@
-from flask import Flask, request, jsonify,Blueprint
-import os,json
-import google.generativeai as genai
+from flask import Flask, request, jsonify,Blueprint,Response,stream_with_context,current_app
+import os,json,re
+import threading
 import json
+from concurrent.futures import ThreadPoolExecutor
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from RecipePackage.Models.models import Aisavedrecipe, db
+from RecipePackage import startup, metrics
+from RecipePackage.Airecipe.response_cache import from_config as response_cache_from_config, prompt_key
+from RecipePackage.Airecipe.gateway import GatewayError, from_config as gateway_from_config
+from RecipePackage.Airecipe.json_stream import JsonFieldStream
+from RecipePackage.Recipes.recipes import get_dataset
 
 with open(os.path.join(os.path.dirname(__file__),'../../config.json')) as a:
     data = json.load(a)["gemini"]
 # print(data)
 API_KEY = data["apikey"]
 MODEL = data["model"]
-genai.configure(api_key=API_KEY)
+
+# Same prompt -> same answer: memory LRU + optional shared DB tier ("gemini": {"cache": {...}})
+response_cache = response_cache_from_config(data.get("cache", {}))
+metrics.register('gemini_response_cache', response_cache.stats)
+
+# Seconds a request waits for Gemini before giving up on its answer
+REQUEST_TIMEOUT = data.get("timeout_seconds", 30)
+
+# Meal-plan batches: how many questions one request may carry, and how many run at once
+batch_conf = data.get("batch", {})
+BATCH_MAX_ITEMS = batch_conf.get("max_items", 21)
+BATCH_PARALLELISM = batch_conf.get("parallelism", 4)
+
+# /ask answers from cuisines.csv when the prompt names a recipe in it, Gemini otherwise
+retrieval_conf = data.get("retrieval", {})
+RETRIEVAL_ENABLED = retrieval_conf.get("enabled", True)
+RETRIEVAL_MIN_CONFIDENCE = retrieval_conf.get("min_confidence", 0.85)
+
+# The Gemini SDK is imported and configured by the first AI request, not at startup
+_genai = None
+_model = None
+_genai_lock = threading.Lock()
+
+
+def get_genai():
+    global _genai
+    if _genai is None:
+        with _genai_lock:
+            if _genai is None:
+                with startup.timed('airecipe.genai'):
+                    import google.generativeai as genai
+                    genai.configure(api_key=API_KEY)
+                    _genai = genai
+    return _genai
+
+
+def get_model():
+    """One GenerativeModel shared by every request in the process."""
+    global _model
+    if _model is None:
+        genai = get_genai()
+        with _genai_lock:
+            if _model is None:
+                _model = genai.GenerativeModel(MODEL)
+    return _model
+
+
+# Bounded pool, deadlines, retries and a circuit breaker in front of every Gemini call;
+# identical prompts in flight at the same time share one upstream call
+gateway = gateway_from_config(data)
+metrics.register('gemini_gateway', gateway.stats)
 
 airecipe = Blueprint('airecipe', __name__)
 
 
-def get_gemini_response(prompt_text):
+def _generate(prompt_text):
+    # The SDK deadline frees the worker thread too, not just the waiting request
+    return get_model().generate_content(prompt_text, request_options={'timeout': REQUEST_TIMEOUT}).text
+
+
+def get_gemini_response(prompt_text, timeout=REQUEST_TIMEOUT):
     """
     Sends a prompt to the Gemini API and returns the text response.
+    Concurrent identical prompts are coalesced into a single call.
+    Raises GatewayError when Gemini is overloaded, failing or too slow.
     """
-    
-    model = genai.GenerativeModel(MODEL)
 
     try:
-        response = model.generate_content(prompt_text)
-        return response.text
+        return gateway.call(prompt_key('gemini', prompt_text), lambda: _generate(prompt_text), timeout=timeout)
+    except GatewayError as e:
+        print(f"An error occurred while calling Gemini API: {e!r}")
+        raise
+
+
+def stream_gemini_response(prompt_text):
+    """Yields the text of the Gemini response piece by piece as it is generated."""
+    chunks = gateway.stream(lambda: get_model().generate_content(
+        prompt_text, stream=True, request_options={'timeout': REQUEST_TIMEOUT}))
+    for chunk in chunks:
+        if chunk.text:
+            yield chunk.text
+
+
+def unavailable(**extra):
+    """503 for when Gemini can't answer, so clients know to retry later."""
+    response = jsonify({"error": "AI service unavailable", **extra})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(gateway.breaker.reset_timeout)
+    return response
+
+
+def wants_stream():
+    """Streaming is opt-in: ?stream=1 or Accept: text/event-stream."""
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return 'text/event-stream' in request.headers.get('Accept', '')
+
+
+def sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+def event_stream(events):
+    """Server-Sent Events response that is flushed as each event is yielded."""
+    response = Response(stream_with_context(events), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop nginx-style proxies from buffering the whole body
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def format_recipe(recipe):
+    """A dataset recipe as text, in the same layout the /ask prompt asks Gemini for."""
+    lines = [
+        f"Recipe Name: {recipe.get('name', '')}",
+        f"Cuisine: {str(recipe.get('cuisine') or '').strip()}",
+        f"Course: {str(recipe.get('course') or '').strip()}",
+        f"Diet: {str(recipe.get('diet') or '').strip()}",
+        f"Prep Time: {str(recipe.get('prep_time') or '').strip()}",
+        f"Description: {recipe.get('description', '')}",
+        "Ingredients:",
+    ]
+    lines += [f"- {ingredient}" for ingredient in recipe.get('ingredients', [])]
+    lines += ["Instructions:", recipe.get('instructions', '')]
+    return '\n'.join(lines)
+
+
+def find_local_recipe(user_prompt):
+    """
+    (answer text, extra response fields) for the dataset recipe the prompt
+    names, or None if there is no confident match.
+    """
+    if not RETRIEVAL_ENABLED or not isinstance(user_prompt, str):
+        return None
+    if not user_prompt.strip():
+        return None
+
+    ds = get_dataset()
+    match = ds.closest(user_prompt, min_ratio=RETRIEVAL_MIN_CONFIDENCE)
+    if match is None:
+        return None
+    row, confidence = match
+    recipe = ds.payload(row)
+    return format_recipe(recipe), {"recipe": recipe.get('name'), "confidence": round(confidence, 3)}
+
+
+def stream_answer(prompts, local=None):
+    """`chunk` events with the text as it arrives, then `done` with the full answer."""
+    if local is not None:
+        answer, extra = local
+        yield sse('chunk', {"text": answer})
+        yield sse('done', {"answer": answer, "source": "dataset", **extra})
+        return
+
+    cached = response_cache.get('ask', prompts)
+    if cached is not None:
+        yield sse('chunk', {"text": cached})
+        yield sse('done', {"answer": cached, "source": "gemini"})
+        return
+
+    parts = []
+    try:
+        for text in stream_gemini_response(prompts):
+            parts.append(text)
+            yield sse('chunk', {"text": text})
     except Exception as e:
-        print(f"An error occurred while calling Gemini API: {e}")
-        
+        print(f"An error occurred while streaming from Gemini API: {e!r}")
+        yield sse('error', {"error": "AI service unavailable"})
+        return
+
+    answer = ''.join(parts)
+    response_cache.put('ask', prompts, answer)
+    yield sse('done', {"answer": answer, "source": "gemini"})
+
 @airecipe.route('/ask', methods=['POST'])
 
 def ask_ai():
@@ -55,11 +217,25 @@ If the input does not contain a valid food item or recipe name, respond with: "E
 """.strip()
 
     print(prompts)
-    ai_response = get_gemini_response(prompts)
+    # Dishes already in the dataset are answered from it, without calling Gemini
+    local = find_local_recipe(user_prompt)
+    if wants_stream():
+        return event_stream(stream_answer(prompts, local))
+    if local is not None:
+        answer, extra = local
+        return jsonify({"answer": answer, "source": "dataset", **extra})
+
+    ai_response = response_cache.get('ask', prompts)
+    if ai_response is None:
+        try:
+            ai_response = get_gemini_response(prompts)
+        except GatewayError:
+            return unavailable()
+        response_cache.put('ask', prompts, ai_response)
     
 
     # Return the AI's response as JSON
-    return jsonify({"answer": ai_response})
+    return jsonify({"answer": ai_response, "source": "gemini"})
         
         
 """This Route if for making recipes with few questions to the user.
@@ -69,18 +245,15 @@ import re
 import json
 from flask import request, jsonify
 
-@airecipe.route('/ai-recipe-qusn', methods=['POST'])
-def ai_recipe_qusn():
-    data = request.get_json()
-    print(data)
-
+def recipe_prompt(data):
+    """The JSON-recipe prompt for the answers to the recipe questions."""
     meal = data.get("mealType")
     ingredient = data.get("mainIngredient").strip()
     spice = data.get("spiceLevel")
     cuisine = data.get("cuisine")
     time = data.get("timeAvailable")
 
-    promptdata = f"""
+    return f"""
     Generate a {spice} {cuisine} recipe for {meal} using {ingredient}.
     The recipe should take about {time} to prepare.
     Return the response strictly in this JSON format:
@@ -92,29 +265,157 @@ def ai_recipe_qusn():
   "steps": ["...", "..."]
 }}
     """
-    print("Prompt:", promptdata)
 
-    airesponse = get_gemini_response(promptdata)
-    print("Raw AI Response:")
-    print(airesponse)
 
+def parse_recipe(airesponse):
+    """The recipe dict from the raw AI text; raises ValueError if it is not valid JSON."""
     # ✅ Clean any ```json ... ``` or ``` blocks
     cleaned = re.sub(r"```(?:json)?\s*([\s\S]*?)```", r"\1", airesponse).strip()
     print("Cleaned AI Response:")
     print(cleaned)
 
     # ✅ Now try to parse cleaned string into dict
+    return json.loads(cleaned)
+
+
+def generate_recipe(promptdata):
+    """
+    The parsed recipe for the prompt, from the cache or from Gemini.
+    Raises GatewayError if Gemini can't answer, JSONDecodeError if the answer isn't JSON.
+    """
+    # Cache hits already hold the parsed recipe, so cleanup and json.loads are skipped too
+    parsed = response_cache.get('qusn', promptdata)
+    if parsed is not None:
+        return parsed
+
+    airesponse = get_gemini_response(promptdata)
+    print("Raw AI Response:")
+    print(airesponse)
+
+    parsed = parse_recipe(airesponse)
+    print("Parsed Recipe:")
+    print(parsed)
+    response_cache.put('qusn', promptdata, parsed)
+    return parsed
+
+
+def stream_recipe(promptdata):
+    """
+    A `field` event for each top-level key ("name", "prep_time", "ingredients",
+    "steps") as soon as its value is complete, then `done` with the whole recipe.
+    """
+    parsed = response_cache.get('qusn', promptdata)
+    if parsed is not None:
+        for key, value in parsed.items():
+            yield sse('field', {"key": key, "value": value})
+        yield sse('done', {"status": True, "answer": parsed})
+        return
+
+    parser = JsonFieldStream()
+    parts = []
     try:
-        parsed = json.loads(cleaned)
+        for text in stream_gemini_response(promptdata):
+            parts.append(text)
+            for key, value in parser.feed(text):
+                yield sse('field', {"key": key, "value": value})
+    except Exception as e:
+        print(f"An error occurred while streaming from Gemini API: {e!r}")
+        yield sse('error', {"status": False, "error": "AI service unavailable"})
+        return
+
+    try:
+        parsed = parse_recipe(''.join(parts))
     except json.JSONDecodeError as e:
         print("JSON decode failed:", e)
-        return jsonify({"status": False, "error": "AI response not valid JSON"}), 400
+        yield sse('error', {"status": False, "error": "AI response not valid JSON"})
+        return
 
-    print("Parsed Recipe:")
-    print(parsed)
+    response_cache.put('qusn', promptdata, parsed)
+    yield sse('done', {"status": True, "answer": parsed})
+
+
+@airecipe.route('/ai-recipe-qusn', methods=['POST'])
+def ai_recipe_qusn():
+    data = request.get_json()
+    print(data)
+
+    promptdata = recipe_prompt(data)
+    print("Prompt:", promptdata)
+
+    if wants_stream():
+        return event_stream(stream_recipe(promptdata))
+
+    try:
+        parsed = generate_recipe(promptdata)
+    except GatewayError:
+        return unavailable(status=False)
+    except json.JSONDecodeError as e:
+        print("JSON decode failed:", e)
+        return jsonify({"status": False, "error": "AI response not valid JSON"}), 400
 
     return jsonify({"status": True, "answer": parsed})
 
+
+def _batch_item(app, promptdata):
+    """One batch entry as the single-question endpoint would have answered it."""
+    with app.app_context():
+        try:
+            return {"status": True, "answer": generate_recipe(promptdata)}
+        except GatewayError:
+            return {"status": False, "error": "AI service unavailable"}
+        except json.JSONDecodeError as e:
+            print("JSON decode failed:", e)
+            return {"status": False, "error": "AI response not valid JSON"}
+        except Exception as e:
+            # e.g. the response cache's database; one bad item must not fail the whole batch
+            print(f"Batch item failed: {e!r}")
+            return {"status": False, "error": "Could not generate this recipe"}
+
+
+@airecipe.route('/ai-recipe-qusn/batch', methods=['POST'])
+def ai_recipe_qusn_batch():
+    """
+    Several question sets in one request, e.g. a week's meal plan:
+    {"questions": [{"mealType": ..., "mainIngredient": ..., ...}, ...]}
+    Results come back in the same order, each with its own status.
+    """
+    data = request.get_json(silent=True) or {}
+    questions = data.get('questions')
+    if not isinstance(questions, list) or not questions:
+        return jsonify({"status": False, "error": "Provide questions as a non-empty list"}), 400
+    if len(questions) > BATCH_MAX_ITEMS:
+        return jsonify({"status": False, "error": f"At most {BATCH_MAX_ITEMS} questions per batch"}), 400
+
+    # Identical question sets are generated once and shared
+    prompts = {}
+    keys = []
+    for question in questions:
+        if not isinstance(question, dict) or not isinstance(question.get("mainIngredient"), str):
+            keys.append(None)
+            continue
+        promptdata = recipe_prompt(question)
+        key = prompt_key('qusn', promptdata)
+        prompts.setdefault(key, promptdata)
+        keys.append(key)
+
+    results = {}
+    if prompts:
+        app = current_app._get_current_object()
+        with ThreadPoolExecutor(max_workers=min(BATCH_PARALLELISM, len(prompts))) as pool:
+            futures = {key: pool.submit(_batch_item, app, promptdata) for key, promptdata in prompts.items()}
+            results = {key: future.result() for key, future in futures.items()}
+
+    items = [
+        {"index": i, **(results[key] if key else {"status": False, "error": "Invalid question"})}
+        for i, key in enumerate(keys)
+    ]
+    return jsonify({
+        "status": all(item["status"] for item in items),
+        "count": len(items),
+        "unique": len(prompts),
+        "results": items,
+    })
+
 @airecipe.route('/ai-recipe-save', methods=['POST'])
 @jwt_required()
 def ai_recipe_save():
@@ -139,15 +440,16 @@ def ai_recipe_saved():
     current_user_id = get_jwt_identity()
     print("Current User ID:", current_user_id)
 
-    saved_recipes = Aisavedrecipe.query.filter_by(user_id=current_user_id).all()
+    # Only recipe_id and recipe_name are selected; the recipe JSON stays in the database
+    saved_recipes = db.session.query(Aisavedrecipe.recipe_id, Aisavedrecipe.recipe_name) \
+        .filter_by(user_id=current_user_id).all()
 
-    # Extract only recipe_id and recipe name
     recipes_list = [
         {
-            "id": recipe.recipe_id,
-            "name": recipe.recipe.get("name", "Unnamed Recipe")
+            "id": recipe_id,
+            "name": recipe_name or "Unnamed Recipe"
         }
-        for recipe in saved_recipes
+        for recipe_id, recipe_name in saved_recipes
     ]
 
     return jsonify({"status": True, "recipes": recipes_list}), 200
@@ -172,12 +474,11 @@ def ai_recipe_delete(recipe_id):
     current_user_id = get_jwt_identity()
     print("Current User ID:", current_user_id)
 
-    recipe = Aisavedrecipe.query.filter_by(recipe_id=recipe_id, user_id=current_user_id).first()
+    # Deleted in SQL, without loading the row first
+    deleted = Aisavedrecipe.query.filter_by(recipe_id=recipe_id, user_id=current_user_id).delete()
+    db.session.commit()
 
-    if not recipe:
+    if not deleted:
         return jsonify({"status": False, "message": "Recipe not found"}), 404
 
-    db.session.delete(recipe)
-    db.session.commit()
-
     return jsonify({"status": True, "message": "Recipe deleted successfully"}), 200
\ No newline at end of file
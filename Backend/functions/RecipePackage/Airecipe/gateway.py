@@ -0,0 +1,323 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from RecipePackage.Airecipe.singleflight import SingleFlight
+
+# Matched by class name so google.api_core / grpc don't have to be imported here
+RETRYABLE_ERRORS = {
+    'ServiceUnavailable', 'TooManyRequests', 'ResourceExhausted', 'DeadlineExceeded',
+    'InternalServerError', 'GatewayTimeout', 'ConnectionError', 'TimeoutError',
+}
+
+
+def is_retryable(error):
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__)
+
+
+class GatewayError(Exception):
+    """Gemini could not answer; the endpoints turn this into a 503."""
+
+
+class Overloaded(GatewayError):
+    pass
+
+
+class CircuitOpen(GatewayError):
+    pass
+
+
+class UpstreamTimeout(GatewayError):
+    pass
+
+
+class UpstreamError(GatewayError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures; while open
+    every call fails fast. After `reset_timeout` seconds one probe call is let
+    through (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'open':
+                if self._clock() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = 'half_open'
+                self._probing = False
+            if self.state == 'half_open':
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def release(self):
+        """Gives back a half-open probe that never reached upstream."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = self._clock()
+            self._probing = False
+
+
+class GeminiGateway:
+    """
+    The one way out to Gemini. At most `max_workers` calls or streams run at
+    a time and `max_queue` more may wait; beyond that callers are rejected
+    straight away. Each caller waits at most `timeout` seconds, retryable
+    errors are retried with jittered exponential backoff inside that deadline,
+    and identical concurrent prompts share one call. The circuit breaker sees
+    every upstream attempt once, however many callers share it.
+    """
+
+    def __init__(self, max_workers=4, max_queue=16, timeout=30, retries=2, backoff=0.5, max_backoff=8,
+                 breaker=None, clock=time.monotonic, sleep=time.sleep):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker or CircuitBreaker()
+        self._clock = clock
+        self._sleep = sleep
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='gemini')
+        # Upstream slots, shared by pooled calls and streams
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self.inflight = SingleFlight(self)
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.retried = 0
+        self.rejected = 0
+        self.short_circuited = 0
+        self._latencies = deque(maxlen=512)
+
+    # --- admission -------------------------------------------------------
+
+    def _admit(self, counter):
+        """Counts one more queued/running call, or raises Overloaded when there is no room."""
+        with self._lock:
+            if self.queued + self.running >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise Overloaded('Too many AI requests waiting')
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def submit(self, fn):
+        """Executor interface for SingleFlight: queue `fn` unless the queue is full."""
+        self._admit('queued')
+
+        def task():
+            with self._slots:
+                with self._lock:
+                    self.queued -= 1
+                    self.running += 1
+                try:
+                    return fn()
+                finally:
+                    with self._lock:
+                        self.running -= 1
+
+        return self._executor.submit(task)
+
+    def _check_circuit(self):
+        if not self.breaker.allow():
+            with self._lock:
+                self.short_circuited += 1
+            raise CircuitOpen('AI service is temporarily unavailable')
+
+    # --- calls -----------------------------------------------------------
+
+    def _delay(self, attempt):
+        # "Full jitter": anywhere between 0 and the exponential step
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _retry(self, error, attempt, deadline):
+        """Sleeps before the next attempt and returns True if `error` is worth retrying in time."""
+        delay = self._delay(attempt)
+        if not (is_retryable(error) and attempt < self.retries and self._clock() + delay < deadline):
+            return False
+        with self._lock:
+            self.retried += 1
+        self._sleep(delay)
+        return True
+
+    def _attempts(self, fn, deadline):
+        """Runs fn() on a worker, retrying retryable errors while the deadline allows."""
+        started = self._clock()
+        attempt = 0
+        while True:
+            try:
+                result = fn()
+            except Exception as e:
+                self.breaker.record_failure()
+                if self._retry(e, attempt, deadline):
+                    attempt += 1
+                    continue
+                self._record(started, ok=False)
+                raise UpstreamError(f'Gemini call failed: {e!r}') from e
+            self.breaker.record_success()
+            self._record(started, ok=True)
+            return result
+
+    def _record(self, started, ok):
+        with self._lock:
+            self.calls += 1
+            self._latencies.append(self._clock() - started)
+            if not ok:
+                self.errors += 1
+
+    def call(self, key, fn, timeout=None):
+        """
+        Result of fn() run through the pool, coalesced on `key`.
+        Raises a GatewayError subclass instead of waiting forever or returning None.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = self._clock() + timeout
+        self._check_circuit()
+        try:
+            return self.inflight.run(key, lambda: self._attempts(fn, deadline), timeout=timeout)
+        except Overloaded:
+            self.breaker.release()
+            raise
+        except FutureTimeout:
+            # Only this caller gives up; the call itself reports to the breaker when it ends
+            with self._lock:
+                self.timeouts += 1
+            raise UpstreamTimeout(f'No answer from Gemini within {timeout}s')
+
+    def _acquire_stream_slot(self, deadline):
+        """Waits (as a queued call) for an upstream slot until the deadline."""
+        try:
+            self._admit('queued')
+        except Overloaded:
+            self.breaker.release()
+            raise
+        acquired = self._slots.acquire(timeout=max(0.0, deadline - self._clock()))
+        with self._lock:
+            self.queued -= 1
+            if acquired:
+                self.running += 1
+            else:
+                self.timeouts += 1
+        if not acquired:
+            self.breaker.release()
+            raise UpstreamTimeout('No free slot for a Gemini stream in time')
+
+    def stream(self, open_stream, timeout=None):
+        """
+        Yields from the iterator returned by open_stream(), holding one of the
+        same `max_workers` slots as call(). Only opening the stream is retried,
+        within `timeout`; once the first chunk has been sent a failure ends the
+        stream.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = self._clock() + timeout
+        self._check_circuit()
+        self._acquire_stream_slot(deadline)
+        started = self._clock()
+        try:
+            attempt = 0
+            while True:
+                try:
+                    chunks = iter(open_stream())
+                    first = next(chunks, None)
+                    break
+                except Exception as e:
+                    self.breaker.record_failure()
+                    if self._retry(e, attempt, deadline):
+                        attempt += 1
+                        continue
+                    self._record(started, ok=False)
+                    raise UpstreamError(f'Gemini stream failed: {e!r}') from e
+
+            try:
+                if first is not None:
+                    yield first
+                    yield from chunks
+            except GeneratorExit:
+                # Client went away; says nothing about upstream health
+                self.breaker.release()
+                raise
+            except Exception as e:
+                self.breaker.record_failure()
+                self._record(started, ok=False)
+                raise UpstreamError(f'Gemini stream failed: {e!r}') from e
+            self.breaker.record_success()
+            self._record(started, ok=True)
+        finally:
+            with self._lock:
+                self.running -= 1
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            calls = self.calls
+            stats = {
+                'queue_depth': self.queued,
+                'running': self.running,
+                'calls': calls,
+                'errors': self.errors,
+                'error_rate': round(self.errors / calls, 4) if calls else 0.0,
+                'timeouts': self.timeouts,
+                'retries': self.retried,
+                'rejected': self.rejected,
+                'short_circuited': self.short_circuited,
+            }
+        if latencies:
+            stats['latency_ms'] = {
+                'avg': round(1000 * sum(latencies) / len(latencies), 1),
+                'p50': round(1000 * latencies[len(latencies) // 2], 1),
+                'p95': round(1000 * latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1),
+            }
+        stats['circuit'] = self.breaker.state
+        stats['inflight'] = self.inflight.stats()
+        return stats
+
+
+def from_config(conf):
+    """Gateway built from the "gemini" config section; every key is optional."""
+    gateway_conf = conf.get('gateway', {})
+    return GeminiGateway(
+        max_workers=conf.get('max_concurrency', 4),
+        max_queue=gateway_conf.get('max_queue', 16),
+        timeout=conf.get('timeout_seconds', 30),
+        retries=gateway_conf.get('retries', 2),
+        backoff=gateway_conf.get('backoff_seconds', 0.5),
+        max_backoff=gateway_conf.get('max_backoff_seconds', 8),
+        breaker=CircuitBreaker(
+            failure_threshold=gateway_conf.get('failure_threshold', 5),
+            reset_timeout=gateway_conf.get('reset_seconds', 30),
+        ),
+    )
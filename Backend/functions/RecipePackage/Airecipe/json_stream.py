@@ -0,0 +1,56 @@
+import json
+
+
+class JsonFieldStream:
+    """
+    Incremental parser for a JSON object arriving in pieces. `feed()`
+    returns the top-level (key, value) pairs that became complete with the
+    new text, so e.g. "name" can be shown before "steps" has arrived.
+    Anything before the first '{' (such as a ```json fence) is skipped.
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self.pos = None
+        self.done = False
+        self._decoder = json.JSONDecoder()
+
+    def _skip(self, i, chars=' \t\r\n'):
+        while i < len(self.buffer) and self.buffer[i] in chars:
+            i += 1
+        return i
+
+    def feed(self, text):
+        self.buffer += text
+        fields = []
+        if self.pos is None:
+            start = self.buffer.find('{')
+            if start < 0:
+                return fields
+            self.pos = start + 1
+
+        while not self.done:
+            i = self._skip(self.pos, ' \t\r\n,')
+            if i >= len(self.buffer):
+                break
+            if self.buffer[i] == '}':
+                self.done = True
+                break
+            try:
+                key, i = self._decoder.raw_decode(self.buffer, i)
+            except ValueError:
+                break
+            i = self._skip(i)
+            if i >= len(self.buffer) or self.buffer[i] != ':':
+                break
+            i = self._skip(i + 1)
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, i)
+            except ValueError:
+                break
+            # A bare number/literal at the very end may still be growing ("1" -> "15")
+            if end == len(self.buffer) and not isinstance(value, (str, list, dict)):
+                break
+            fields.append((key, value))
+            self.pos = end
+        return fields
@@ -0,0 +1,135 @@
+"""
+Cache of Gemini results keyed on a hash of the normalized prompt.
+
+Two tiers: an in-process LRU (RecipePackage.cache.TTLCache) and an optional
+table in the app database shared by every instance. What is stored is the
+final value an endpoint returns (answer text, or the already parsed recipe
+dict), so a hit skips the upstream call and any post-processing.
+"""
+import datetime
+import hashlib
+import re
+import threading
+
+from RecipePackage.cache import TTLCache
+from RecipePackage.Models.models import AiResponseCache, db
+
+
+def prompt_key(kind, prompt):
+    """sha256 of the prompt with case and whitespace differences removed."""
+    normalized = re.sub(r'\s+', ' ', prompt).strip().lower()
+    return hashlib.sha256(f'{kind}\0{normalized}'.encode('utf-8')).hexdigest()
+
+
+class SqlResponseStore:
+    """Persistent tier on the existing SQLAlchemy database (needs an app context)."""
+
+    def __init__(self, ttl=7 * 24 * 3600, max_rows=20000, prune_every=200):
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.prune_every = prune_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _cutoff(self):
+        return datetime.datetime.utcnow() - datetime.timedelta(seconds=self.ttl)
+
+    def get(self, key):
+        try:
+            row = db.session.get(AiResponseCache, key)
+        except Exception as e:
+            print(f"AI cache read failed: {e}")
+            db.session.rollback()
+            self.errors += 1
+            return None
+        if row is None or row.created_at < self._cutoff():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row.response
+
+    def put(self, key, kind, value):
+        try:
+            db.session.merge(AiResponseCache(key=key, kind=kind, response=value, created_at=datetime.datetime.utcnow()))
+            db.session.commit()
+        except Exception as e:
+            print(f"AI cache write failed: {e}")
+            db.session.rollback()
+            self.errors += 1
+            return
+
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % self.prune_every == 0
+        if prune:
+            self.prune()
+
+    def prune(self):
+        """Drops expired rows, then the oldest ones beyond max_rows."""
+        try:
+            AiResponseCache.query.filter(AiResponseCache.created_at < self._cutoff()).delete()
+            overflow = AiResponseCache.query.count() - self.max_rows
+            if overflow > 0:
+                oldest = db.session.query(AiResponseCache.key).order_by(AiResponseCache.created_at).limit(overflow)
+                AiResponseCache.query.filter(AiResponseCache.key.in_([k for (k,) in oldest])).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            print(f"AI cache prune failed: {e}")
+            db.session.rollback()
+            self.errors += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'ttl_seconds': self.ttl,
+            'max_rows': self.max_rows,
+            'hits': self.hits,
+            'misses': self.misses,
+            'errors': self.errors,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+class ResponseCache:
+    def __init__(self, memory=None, store=None):
+        self.memory = memory if memory is not None else TTLCache()
+        self.store = store
+
+    def get(self, kind, prompt):
+        key = prompt_key(kind, prompt)
+        value = self.memory.get(key)
+        if value is None and self.store is not None:
+            value = self.store.get(key)
+            if value is not None:
+                self.memory.put(key, value)
+        return value
+
+    def put(self, kind, prompt, value):
+        key = prompt_key(kind, prompt)
+        self.memory.put(key, value)
+        if self.store is not None:
+            self.store.put(key, kind, value)
+
+    def stats(self):
+        return {
+            'memory': self.memory.stats(),
+            'persistent': self.store.stats() if self.store is not None else None,
+        }
+
+
+def from_config(conf):
+    """Builds the cache from the `gemini.cache` section of config.json."""
+    memory = TTLCache(
+        max_entries=conf.get('max_entries', 1000),
+        ttl=conf.get('ttl_seconds', 24 * 3600),
+    )
+    store = None
+    if conf.get('persistent', False):
+        store = SqlResponseStore(
+            ttl=conf.get('persistent_ttl_seconds', 7 * 24 * 3600),
+            max_rows=conf.get('persistent_max_rows', 20000),
+        )
+    return ResponseCache(memory, store)
@@ -0,0 +1,45 @@
+import threading
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one execution on
+    `executor`. Every caller, the first included, waits on the shared
+    future with its own timeout; a caller that gives up does not cancel
+    the call for the others.
+    """
+
+    def __init__(self, executor):
+        self._executor = executor
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.started = 0
+        self.coalesced = 0
+
+    def run(self, key, fn, timeout=None):
+        """Result of fn(), shared with concurrent callers of the same key.
+        Raises concurrent.futures.TimeoutError after `timeout` seconds."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._executor.submit(fn)
+                self._calls[key] = future
+                self.started += 1
+            else:
+                self.coalesced += 1
+        if leader:
+            future.add_done_callback(lambda done: self._forget(key, done))
+        return future.result(timeout=timeout)
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def stats(self):
+        return {
+            'in_flight': len(self._calls),
+            'started': self.started,
+            'coalesced': self.coalesced,
+        }
@@ -1,16 +1,20 @@
-from flask import Blueprint, jsonify, request,url_for
+from flask import Blueprint, jsonify, request,url_for,Response
 import random
 from flask_jwt_extended import create_access_token,verify_jwt_in_request,jwt_required
 import os
 import json
 import datetime
+import hmac
 from RecipePackage.Mail.mailsender import send_email
 from RecipePackage.Mail.defaultmail import send_welcome_email
 from RecipePackage.Models.models import User,db
-from werkzeug.security import generate_password_hash,check_password_hash
 from flask_jwt_extended import jwt_required, get_jwt_identity
-import base64
-from RecipePackage.oauth import oauth
+from RecipePackage.oauth import google_client
+from RecipePackage.Auth.avatars import sniff_image_type, image_hash, make_thumbnail, avatar_url
+from RecipePackage.Auth.otp_store import from_config as otp_store_from_config
+from RecipePackage.Auth.hashing import HashingBusy, from_config as hasher_from_config
+from RecipePackage.Auth.profile_cache import from_config as profile_cache_from_config
+from RecipePackage import metrics
 
 
 
@@ -18,7 +22,25 @@ from RecipePackage.oauth import oauth
 
 authp = Blueprint('auth', __name__)
 
-otp_store = {}
+with open(os.path.join(os.path.dirname(__file__), '../../config.json')) as f:
+    auth_config = json.load(f)
+otp_conf = auth_config.get('otp', {})
+
+# Codes expire and are shared between instances ("otp": {"backend": "sql"|"memory", ...})
+otp_store = otp_store_from_config(otp_conf)
+metrics.register('otp_store', otp_store.stats)
+
+# Password hashes are computed a few at a time ("password_hashing": {"method": ..., "max_concurrency": ...})
+hasher = hasher_from_config(auth_config.get('password_hashing', {}))
+metrics.register('password_hashing', hasher.stats)
+
+# whoami bodies per user, so repeat calls skip MySQL and get a 304 when nothing changed
+profile_cache = profile_cache_from_config(auth_config.get('profile_cache', {}))
+metrics.register('profile_cache', profile_cache.stats)
+
+
+def hashing_busy():
+    return jsonify({'success': False, 'message': 'Server busy, please try again'}), 503
 
 
 
@@ -42,9 +64,19 @@ def login():
         return jsonify({'success': False, 'message': 'Email and password are required'}), 400
 
     user = User.query.filter_by(email=email).first()
-    if not user or not check_password_hash(user.password, password):
+    try:
+        valid = user is not None and hasher.check(user.password, password)
+    except HashingBusy:
+        return hashing_busy()
+    if not valid:
         return jsonify({'success': False, 'message': 'Invalid credentials'}), 401
 
+    # Hashes made with older parameters are replaced now that we have the password
+    new_hash = hasher.upgrade(user.password, password)
+    if new_hash:
+        user.password = new_hash
+        db.session.commit()
+
     # ✅ JWT Token valid for 30 days
     access_token = create_access_token(identity=str(user.id))
 
@@ -79,9 +111,8 @@ def getotp():
             'message':'Email already exists',
         }),400
     otp= otpgen()
-    otp_store[data.get('email')] = otp
+    otp_store.put('register', email, otp)
     print ("Stored Otp")
-    print(otp_store)
     send_email(
         subject="Your Registration Otp",
         recipient=data.get('email'),
@@ -115,14 +146,19 @@ def register():
             'message':'Email already exists',
         }),400
     print("Entered2")
-    print(otp_store)
-    if email not in otp_store or otp_store[email] != otp:
+    # Used up on success, so the same code can't register twice
+    if not otp_store.verify('register', email, otp, consume=True):
         return jsonify({
             'success':False,
             'message':'Invalid OTP',
         }),400
     print("Entered3")
-    hashed_password = generate_password_hash(password)
+    try:
+        hashed_password = hasher.hash(password)
+    except HashingBusy:
+        # Give the code back so the user can simply retry
+        otp_store.put('register', email, otp)
+        return hashing_busy()
     new_user = User(
         name=name,
         email=email,
@@ -130,7 +166,6 @@ def register():
     )
     db.session.add(new_user)
     db.session.commit()
-    del otp_store[email]
     return jsonify({
         'success':True,
         'message':'registratiion Successful',
@@ -157,7 +192,7 @@ def send_email_otp():
         return jsonify({'success': False, 'message': 'Email not registered'}), 400
 
     otp = otpgen()
-    otp_store[email] = otp
+    otp_store.put('reset', email, otp)
     print(f"Generated OTP for {email}: {otp}")
     send_email(
         subject="Your forgot password Otp",
@@ -180,7 +215,7 @@ def verify_otp():
     if not email or otp == 0:
         return jsonify({'success': False, 'message': 'Invalid request'}), 400
 
-    if otp_store.get(email) != otp:
+    if not otp_store.verify('reset', email, otp):
         return jsonify({'success': False, 'message': 'Invalid OTP'}), 400
 
     return jsonify({'success': True, 'message': 'OTP verified'}), 200
@@ -200,11 +235,15 @@ def reset_password():
     if not user:
         return jsonify({'success': False, 'message': 'User not found'}), 404
 
-    hashed = generate_password_hash(new_password)
+    try:
+        hashed = hasher.hash(new_password)
+    except HashingBusy:
+        return hashing_busy()
     user.password = hashed
     db.session.commit()
+    profile_cache.invalidate(user.id)
 
-    otp_store.pop(email, None)
+    otp_store.discard('reset', email)
 
     return jsonify({'success': True, 'message': 'Password reset successful'}), 200
 
@@ -215,7 +254,8 @@ def reset_password():
     
 @authp.route('/', methods=['GET'])
 def index():
-    return f'{otp_store}', 200
+    # OTP counters are on /metrics (token protected); nothing about the store here
+    return 'Hello from auth', 200
 
 
 
@@ -232,14 +272,26 @@ def index():
 @jwt_required()
 def whoami():
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user:
+    cached = profile_cache.get(user_id, lambda: profile_payload(user_id))
+    if cached is None:
         return jsonify({'success': False, 'message': 'User not found'}), 404
 
-    # Convert image BLOB to base64 string
-    image_base64 = base64.b64encode(user.image).decode('utf-8') if user.image else None
+    body, etag = cached
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    # Per user, and always revalidated so a changed profile shows up at once
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
-    return jsonify({
+
+def profile_payload(user_id):
+    user = User.query.get(user_id)
+    if not user:
+        return None
+
+    # The picture itself is served (and cached) by /auth/avatar
+    return {
         'success': True,
         'user': {
             'name': user.name,
@@ -247,10 +299,70 @@ def whoami():
             'phone': user.phone,
             'age': user.age,
             'bio': user.bio,
-            'image': f"data:image/png;base64,{image_base64}" if image_base64 else None
+            **avatar_fields(user),
         }
-    }), 200
-    
+    }
+
+
+def avatar_version(user):
+    """
+    The user's image hash, or None without a picture. Pictures uploaded before
+    image_hash existed are hashed (and the hash stored) on first use.
+    """
+    if user.image_hash:
+        return user.image_hash
+    data = db.session.query(User.image).filter_by(id=user.id).scalar()
+    if not data:
+        return None
+    user.image_hash = image_hash(data)
+    db.session.commit()
+    return user.image_hash
+
+
+def avatar_fields(user):
+    """Profile JSON points at the avatar URLs instead of inlining the picture."""
+    version = avatar_version(user)
+    if not version:
+        return {'image': None, 'thumbnail': None}
+    return {
+        'image': avatar_url(user.id, version),
+        'thumbnail': avatar_url(user.id, version, thumbnail=True),
+    }
+
+
+@authp.route('/avatar/<int:user_id>', methods=['GET'])
+def avatar(user_id):
+    """
+    The user's picture (or ?size=thumb) as raw bytes, with ETag and long-lived
+    caching. Only served with the `v` the profile's avatar URL carries, so
+    pictures can't be fetched by walking user ids.
+    """
+    row = db.session.query(User.image_hash, User.image_type).filter_by(id=user_id).first()
+    version = request.args.get('v', '')
+    if not row or not row.image_hash or not hmac.compare_digest(version.encode(), row.image_hash[:16].encode()):
+        return jsonify({'success': False, 'message': 'No profile image'}), 404
+    etag, content_type = row
+
+    thumb = request.args.get('size') == 'thumb'
+    etag = f"{etag}-thumb" if thumb else etag
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers={'ETag': f'"{etag}"'})
+
+    column = User.thumbnail if thumb else User.image
+    data = db.session.query(column).filter_by(id=user_id).scalar()
+    if thumb and not data:
+        # No thumbnail stored (Pillow missing at upload time): fall back to the full image
+        data = db.session.query(User.image).filter_by(id=user_id).scalar()
+    if not data:
+        return jsonify({'success': False, 'message': 'No profile image'}), 404
+
+    response = Response(data, mimetype=sniff_image_type(data) or content_type or 'application/octet-stream')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 86400
+    return response.make_conditional(request)
+
+
 @authp.route('/update-profile', methods=['PUT'])
 @jwt_required()
 def update_profile():
@@ -265,9 +377,15 @@ def update_profile():
 
     if 'image' in request.files:
         image_file = request.files['image']
-        user.image = image_file.read()
+        image = image_file.read()
+        user.image = image
+        user.image_type = sniff_image_type(image) or image_file.mimetype
+        user.image_hash = image_hash(image)
+        # Small copy made once here instead of shipping the full picture to every avatar
+        user.thumbnail = make_thumbnail(image)
 
     db.session.commit()
+    profile_cache.invalidate(user.id)
 
     # Create a serializable user dictionary
     user_data = {
@@ -277,7 +395,7 @@ def update_profile():
         'phone': user.phone,
         'age': user.age,
         'bio': user.bio,
-        'image': f"user_images/{user.id}.png" if user.image else None,  # Update this based on how you serve images
+        **avatar_fields(user),
     }
 
     return jsonify({'success': True, 'user': user_data}), 200
@@ -287,13 +405,13 @@ def update_profile():
 
 @authp.route('/google-login',methods=['Get'])
 def google_login():
-    google = oauth.create_client('google')
+    google = google_client()
     redirect_uri = url_for('auth.google_callback', _external=True)
     return google.authorize_redirect(redirect_uri)
 
 @authp.route('/google/callback')
 def google_callback():
-    google = oauth.create_client('google')
+    google = google_client()
     token = google.authorize_access_token()
     resp = google.get('userinfo')
     user_info = resp.json()
@@ -307,8 +425,11 @@ def google_callback():
         return jsonify({'success': False, 'message': 'Google account did not return email'}), 400
 
     user = User.query.filter_by(email=email).first()
-    dummy_password = generate_password_hash('oauth-google-account')
     if not user:
+        try:
+            dummy_password = hasher.hash('oauth-google-account')
+        except HashingBusy:
+            return hashing_busy()
         user = User(name=name, email=email, password=dummy_password)  # No password
         db.session.add(user)
         db.session.commit()
@@ -0,0 +1,64 @@
+"""Profile pictures: type sniffing, thumbnails and the URLs profiles point at."""
+import hashlib
+import io
+
+from flask import url_for
+
+try:
+    from PIL import Image
+except ImportError:  # no thumbnails, the full image is served instead
+    Image = None
+
+THUMBNAIL_SIZE = (128, 128)
+
+_SIGNATURES = [
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'BM', 'image/bmp'),
+]
+
+
+def sniff_image_type(data):
+    """Content type from the file's magic bytes, or None if it isn't a known image."""
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    for signature, content_type in _SIGNATURES:
+        if data.startswith(signature):
+            return content_type
+    return None
+
+
+def image_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def make_thumbnail(data):
+    """A small JPEG/PNG copy of the image, or None without Pillow or for unreadable images."""
+    if Image is None:
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.thumbnail(THUMBNAIL_SIZE)
+            has_alpha = image.mode in ('RGBA', 'LA', 'P')
+            out = io.BytesIO()
+            if has_alpha:
+                image.save(out, format='PNG', optimize=True)
+            else:
+                image.convert('RGB').save(out, format='JPEG', quality=85, optimize=True)
+            return out.getvalue()
+    except Exception as e:
+        print(f"Could not make a thumbnail: {e!r}")
+        return None
+
+
+def avatar_url(user_id, version, thumbnail=False):
+    """
+    Absolute URL of a user's avatar. `version` (the image hash) changes with
+    every upload, so the URL can be cached for a long time.
+    """
+    params = {'v': version[:16]} if version else {}
+    if thumbnail:
+        params['size'] = 'thumb'
+    return url_for('auth.avatar', user_id=user_id, _external=True, **params)
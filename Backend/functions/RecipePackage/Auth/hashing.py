@@ -0,0 +1,117 @@
+"""
+Password hashing behind a concurrency cap.
+
+Hashing is deliberately slow and CPU bound; on a 1 vCPU instance a burst
+of logins would otherwise starve every other request. At most
+`max_concurrency` hashes run at once, other callers wait up to
+`queue_timeout` seconds for a slot and then get HashingBusy (a 503).
+"""
+import threading
+import time
+from collections import deque
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class HashingBusy(Exception):
+    """No hashing slot became free in time."""
+
+
+class PasswordHasher:
+    def __init__(self, method='scrypt', max_concurrency=1, queue_timeout=5):
+        self.method = method
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._prefix = None
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.hashed = 0
+        self.checked = 0
+        self.rehashed = 0
+        self.rejected = 0
+        self._wait_times = deque(maxlen=256)
+        self._run_times = deque(maxlen=256)
+
+    def _run(self, fn, *args):
+        started = time.monotonic()
+        with self._lock:
+            self.waiting += 1
+        acquired = self._slots.acquire(timeout=self.queue_timeout)
+        with self._lock:
+            self.waiting -= 1
+            if not acquired:
+                self.rejected += 1
+        if not acquired:
+            raise HashingBusy('Too many password checks in progress')
+        try:
+            running = time.monotonic()
+            self._wait_times.append(running - started)
+            return fn(*args)
+        finally:
+            self._run_times.append(time.monotonic() - running)
+            self._slots.release()
+
+    def hash(self, password):
+        """Hash of `password` with the configured method."""
+        result = self._run(generate_password_hash, password, self.method)
+        with self._lock:
+            self.hashed += 1
+        return result
+
+    def check(self, pwhash, password):
+        result = self._run(check_password_hash, pwhash, password)
+        with self._lock:
+            self.checked += 1
+        return result
+
+    def _method_prefix(self):
+        # The method as Werkzeug writes it into the hash ("scrypt" -> "scrypt:32768:8:1")
+        if self._prefix is None:
+            self._prefix = generate_password_hash('', self.method).split('$', 1)[0]
+        return self._prefix
+
+    def needs_rehash(self, pwhash):
+        """True if `pwhash` was made with other parameters than the configured ones."""
+        return pwhash.split('$', 1)[0] != self._method_prefix()
+
+    def upgrade(self, pwhash, password):
+        """
+        New hash for a password that was just verified, if its stored hash uses
+        old parameters; None if it is current or no slot is free right now.
+        """
+        if not self.needs_rehash(pwhash):
+            return None
+        try:
+            new_hash = self.hash(password)
+        except HashingBusy:
+            return None  # next login will try again
+        with self._lock:
+            self.rehashed += 1
+        return new_hash
+
+    def stats(self):
+        wait_times = list(self._wait_times)
+        run_times = list(self._run_times)
+        stats = {
+            'method': self.method,
+            'max_concurrency': self.max_concurrency,
+            'waiting': self.waiting,
+            'hashed': self.hashed,
+            'checked': self.checked,
+            'rehashed': self.rehashed,
+            'rejected': self.rejected,
+        }
+        if run_times:
+            stats['hash_ms'] = round(1000 * sum(run_times) / len(run_times), 1)
+            stats['wait_ms'] = round(1000 * sum(wait_times) / len(wait_times), 1)
+        return stats
+
+
+def from_config(conf):
+    """Builds the hasher from the `password_hashing` section of config.json."""
+    return PasswordHasher(
+        method=conf.get('method', 'scrypt'),
+        max_concurrency=conf.get('max_concurrency', 1),
+        queue_timeout=conf.get('queue_timeout_seconds', 5),
+    )
@@ -0,0 +1,221 @@
+"""
+One-time codes for registration and password reset.
+
+Both backends keep a hash of the code with an expiry time and a count of
+wrong guesses; a code is gone once it expires, is used up, or has been
+guessed wrong `max_attempts` times. Expired entries are swept every
+`sweep_interval` seconds. MemoryOtpStore only works when the send and
+the verify request hit the same instance; SqlOtpStore keeps the codes in
+the app database so any instance can check them.
+"""
+import datetime
+import hashlib
+import threading
+import time
+
+from RecipePackage.Models.models import OtpCode, db
+
+
+def _key(purpose, email):
+    return f"{purpose}:{email.strip().lower()}"
+
+
+def _digest(key, code):
+    return hashlib.sha256(f"{key}\0{code}".encode('utf-8')).hexdigest()
+
+
+class MemoryOtpStore:
+    def __init__(self, ttl=600, max_attempts=5, sweep_interval=300, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+        self.sweep_interval = sweep_interval
+        self._clock = clock
+        self._entries = {}  # key -> [digest, expires_at, attempts]
+        self._lock = threading.Lock()
+        self._last_sweep = clock()
+        self.issued = 0
+        self.verified = 0
+        self.rejected = 0
+        self.expired = 0
+        self.locked_out = 0
+
+    def put(self, purpose, email, code):
+        """Stores a new code, replacing any earlier one for the same email and purpose."""
+        key = _key(purpose, email)
+        with self._lock:
+            self._entries[key] = [_digest(key, code), self._clock() + self.ttl, 0]
+            self.issued += 1
+        self._maybe_sweep()
+
+    def verify(self, purpose, email, code, consume=False):
+        """True if `code` is the live code; a used-up, expired or locked code is removed."""
+        key = _key(purpose, email)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.rejected += 1
+                return False
+            digest, expires_at, attempts = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expired += 1
+                return False
+            if digest != _digest(key, code):
+                entry[2] = attempts + 1
+                self.rejected += 1
+                if entry[2] >= self.max_attempts:
+                    del self._entries[key]
+                    self.locked_out += 1
+                return False
+            if consume:
+                del self._entries[key]
+            self.verified += 1
+            return True
+
+    def discard(self, purpose, email):
+        with self._lock:
+            self._entries.pop(_key(purpose, email), None)
+
+    def _maybe_sweep(self):
+        if self._clock() - self._last_sweep >= self.sweep_interval:
+            self.sweep()
+
+    def sweep(self):
+        """Drops every expired code."""
+        now = self._clock()
+        with self._lock:
+            self._last_sweep = now
+            for key in [k for k, entry in self._entries.items() if entry[1] <= now]:
+                del self._entries[key]
+                self.expired += 1
+
+    def stats(self):
+        return {
+            'backend': 'memory',
+            'pending': len(self._entries),
+            'issued': self.issued,
+            'verified': self.verified,
+            'rejected': self.rejected,
+            'expired': self.expired,
+            'locked_out': self.locked_out,
+        }
+
+
+class SqlOtpStore:
+    """Codes in the otp_codes table, shared by every instance (needs an app context)."""
+
+    def __init__(self, ttl=600, max_attempts=5, sweep_interval=300):
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+        self.sweep_interval = sweep_interval
+        self._last_sweep = time.monotonic()
+        self._sweep_lock = threading.Lock()
+        self.issued = 0
+        self.verified = 0
+        self.rejected = 0
+        self.errors = 0
+
+    @staticmethod
+    def _now():
+        return datetime.datetime.utcnow()
+
+    def put(self, purpose, email, code):
+        key = _key(purpose, email)
+        try:
+            db.session.merge(OtpCode(
+                key=key,
+                code_hash=_digest(key, code),
+                attempts=0,
+                expires_at=self._now() + datetime.timedelta(seconds=self.ttl),
+            ))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            self.errors += 1
+            raise
+        self.issued += 1
+        self._maybe_sweep()
+
+    def verify(self, purpose, email, code, consume=False):
+        key = _key(purpose, email)
+        try:
+            row = db.session.get(OtpCode, key)
+            if row is None:
+                self.rejected += 1
+                return False
+            if row.expires_at <= self._now():
+                db.session.delete(row)
+                db.session.commit()
+                self.rejected += 1
+                return False
+            if row.code_hash != _digest(key, code):
+                # Counted in SQL so concurrent guesses on other instances add up
+                OtpCode.query.filter_by(key=key).update({OtpCode.attempts: OtpCode.attempts + 1})
+                OtpCode.query.filter(OtpCode.key == key, OtpCode.attempts >= self.max_attempts).delete()
+                db.session.commit()
+                self.rejected += 1
+                return False
+            if consume:
+                # Only one request can delete the row, so a code can't be used twice
+                if not OtpCode.query.filter_by(key=key).delete():
+                    db.session.rollback()
+                    self.rejected += 1
+                    return False
+            db.session.commit()
+        except Exception as e:
+            print(f"OTP lookup failed: {e}")
+            db.session.rollback()
+            self.errors += 1
+            return False
+        self.verified += 1
+        return True
+
+    def discard(self, purpose, email):
+        try:
+            OtpCode.query.filter_by(key=_key(purpose, email)).delete()
+            db.session.commit()
+        except Exception as e:
+            print(f"OTP discard failed: {e}")
+            db.session.rollback()
+            self.errors += 1
+
+    def _maybe_sweep(self):
+        with self._sweep_lock:
+            if time.monotonic() - self._last_sweep < self.sweep_interval:
+                return
+            self._last_sweep = time.monotonic()
+        self.sweep()
+
+    def sweep(self):
+        try:
+            OtpCode.query.filter(OtpCode.expires_at <= self._now()).delete()
+            db.session.commit()
+        except Exception as e:
+            print(f"OTP sweep failed: {e}")
+            db.session.rollback()
+            self.errors += 1
+
+    def stats(self):
+        return {
+            'backend': 'sql',
+            'issued': self.issued,
+            'verified': self.verified,
+            'rejected': self.rejected,
+            'errors': self.errors,
+        }
+
+
+def from_config(conf):
+    """Builds the store from the `otp` section of config.json."""
+    backend = conf.get('backend', 'sql')
+    options = {
+        'ttl': conf.get('ttl_seconds', 600),
+        'max_attempts': conf.get('max_attempts', 5),
+        'sweep_interval': conf.get('sweep_interval_seconds', 300),
+    }
+    if backend == 'memory':
+        return MemoryOtpStore(**options)
+    if backend == 'sql':
+        return SqlOtpStore(**options)
+    raise ValueError(f"Unknown otp backend: {backend}")
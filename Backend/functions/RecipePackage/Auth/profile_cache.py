@@ -0,0 +1,46 @@
+"""
+Serialized /auth/whoami bodies per user id, with their ETags.
+
+Entries live for a short TTL and are dropped as soon as the profile or
+password changes on this instance; other instances catch up within the TTL.
+"""
+import hashlib
+
+from flask import current_app
+
+from RecipePackage.cache import TTLCache
+
+
+class ProfileCache:
+    def __init__(self, max_entries=2048, ttl=60):
+        self.cache = TTLCache(max_entries=max_entries, ttl=ttl)
+
+    def get(self, user_id, build):
+        """
+        (body, etag) for the user. On a miss `build()` is called for the payload
+        dict; None (no such user) is not cached.
+        """
+        key = str(user_id)
+        entry = self.cache.get(key)
+        if entry is None:
+            payload = build()
+            if payload is None:
+                return None
+            body = current_app.json.dumps(payload)
+            entry = (body, hashlib.sha1(body.encode('utf-8')).hexdigest())
+            self.cache.put(key, entry)
+        return entry
+
+    def invalidate(self, user_id):
+        self.cache.invalidate(str(user_id))
+
+    def stats(self):
+        return self.cache.stats()
+
+
+def from_config(conf):
+    """Builds the cache from the `profile_cache` section of config.json."""
+    return ProfileCache(
+        max_entries=conf.get('max_entries', 2048),
+        ttl=conf.get('ttl_seconds', 60),
+    )
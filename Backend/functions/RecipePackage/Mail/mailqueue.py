@@ -0,0 +1,167 @@
+"""
+Outbound mail queue: request handlers enqueue a Message and return, one
+background worker sends them over a single SMTP connection it keeps open.
+
+To try it locally, run an SMTP stand-in and point "mail" in config.json at
+it with "use_tls": false:
+
+    python -m aiosmtpd -n -l localhost:1025
+"""
+import queue
+import smtplib
+import threading
+import time
+from collections import deque
+
+
+def _connection_lost(error):
+    """True for errors after which the message should be retried on a new connection."""
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    if isinstance(error, smtplib.SMTPException):
+        # 421: the server is closing the channel; other SMTP errors are about the message
+        return getattr(error, 'smtp_code', None) == 421
+    # Socket errors: refused, reset, timed out
+    return isinstance(error, OSError)
+
+
+class MailQueue:
+    """
+    Messages that arrive within `batch_window` seconds of each other go out
+    in one batch on the same connection. The connection is closed after
+    `idle_timeout` seconds without mail and reopened on demand; a dropped
+    connection is reopened and the message retried up to `retries` times.
+    """
+
+    def __init__(self, mail, max_queue=1000, batch_window=0.2, max_batch=50, idle_timeout=30, retries=2):
+        self.mail = mail
+        self.app = None
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.idle_timeout = idle_timeout
+        self.retries = retries
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._worker = None
+        self._lock = threading.Lock()
+        self._connection = None
+        self.sent = 0
+        self.failed = 0
+        self.batches = 0
+        self.reconnects = 0
+        self.sent_inline = 0
+        self._send_times = deque(maxlen=256)
+        self._wait_times = deque(maxlen=256)
+
+    def init_app(self, app):
+        self.app = app
+
+    def enqueue(self, message):
+        """Queues the message for the worker. If the queue is full it is sent right away instead."""
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((time.monotonic(), message))
+        except queue.Full:
+            print("Mail queue full, sending inline")
+            self.sent_inline += 1
+            self.mail.send(message)
+
+    def _ensure_worker(self):
+        # Started by the first message rather than at import, so it lives in the serving process
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run, name='mail-queue', daemon=True)
+                    self._worker.start()
+
+    # --- worker ----------------------------------------------------------
+
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                try:
+                    first = self._queue.get(timeout=self.idle_timeout)
+                except queue.Empty:
+                    self._disconnect()
+                    continue
+                batch = [first]
+                deadline = time.monotonic() + self.batch_window
+                while len(batch) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                self._send_batch(batch)
+
+    def _send_batch(self, batch):
+        self.batches += 1
+        for enqueued_at, message in batch:
+            started = time.monotonic()
+            if self._send(message):
+                self.sent += 1
+                self._send_times.append(time.monotonic() - started)
+                self._wait_times.append(started - enqueued_at)
+            else:
+                self.failed += 1
+            self._queue.task_done()
+
+    def _send(self, message):
+        for _ in range(self.retries + 1):
+            try:
+                self._connect().send(message)
+                return True
+            except Exception as e:
+                if not _connection_lost(e):
+                    # Rejected recipient, bad headers...: retrying won't help
+                    print(f"Could not send mail to {message.recipients}: {e!r}")
+                    return False
+                print(f"SMTP connection lost ({e!r}), reconnecting")
+                self._disconnect()
+                self.reconnects += 1
+        print(f"Giving up on mail to {message.recipients}")
+        return False
+
+    def _connect(self):
+        if self._connection is None:
+            connection = self.mail.connect()
+            connection.__enter__()
+            self._connection = connection
+        return self._connection
+
+    def _disconnect(self):
+        connection, self._connection = self._connection, None
+        if connection is None or connection.host is None:
+            return
+        try:
+            connection.host.quit()
+        except Exception:
+            connection.host.close()
+
+    def flush(self, timeout=10):
+        """Waits (up to `timeout` seconds) until everything queued so far has been handled."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return not self._queue.unfinished_tasks
+
+    def stats(self):
+        send_times = sorted(self._send_times)
+        wait_times = list(self._wait_times)
+        stats = {
+            'queue_depth': self._queue.qsize(),
+            'sent': self.sent,
+            'failed': self.failed,
+            'batches': self.batches,
+            'reconnects': self.reconnects,
+            'sent_inline': self.sent_inline,
+            'connected': self._connection is not None,
+        }
+        if send_times:
+            stats['send_ms'] = {
+                'avg': round(1000 * sum(send_times) / len(send_times), 1),
+                'p95': round(1000 * send_times[min(len(send_times) - 1, int(len(send_times) * 0.95))], 1),
+            }
+            stats['queue_wait_ms'] = round(1000 * sum(wait_times) / len(wait_times), 1)
+        return stats
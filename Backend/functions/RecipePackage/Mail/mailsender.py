@@ -1,7 +1,10 @@
+import atexit
 import json
 import os
 from flask_mail import Mail, Message
 from flask import current_app
+from RecipePackage import metrics
+from RecipePackage.Mail.mailqueue import MailQueue
 
 mail = Mail()
 
@@ -9,18 +12,37 @@ mail = Mail()
 with open(os.path.join(os.path.dirname(__file__), '../../config.json')) as f:
     mail_config = json.load(f)["mail"]
 
+# With "queue": {"enabled": true}, mails are handed to a background worker with one
+# long-lived SMTP connection. Off by default: on Cloud Functions the CPU is throttled
+# once the response is returned, so the worker thread may never get to send the mail.
+# Only enable it where the process keeps running between requests.
+queue_conf = mail_config.get("queue", {})
+QUEUE_ENABLED = queue_conf.get("enabled", False)
+mail_queue = MailQueue(
+    mail,
+    max_queue=queue_conf.get("max_queue", 1000),
+    batch_window=queue_conf.get("batch_window_seconds", 0.2),
+    max_batch=queue_conf.get("max_batch", 50),
+    idle_timeout=queue_conf.get("idle_timeout_seconds", 30),
+    retries=queue_conf.get("retries", 2),
+)
+metrics.register('mail_queue', mail_queue.stats)
+# Give queued mail a few seconds to go out when the process shuts down
+atexit.register(mail_queue.flush, 5)
+
 def init_mail(app):
     """Initialize mail system with config.json values."""
     app.config['MAIL_SERVER'] = mail_config["smtp_server"]
     app.config['MAIL_PORT'] = mail_config["smtp_port"]
     app.config['MAIL_USERNAME'] = mail_config["sender_email"]
     app.config['MAIL_PASSWORD'] = mail_config["sender_password"]
-    app.config['MAIL_USE_TLS'] = True
+    app.config['MAIL_USE_TLS'] = mail_config.get("use_tls", True)
     app.config['MAIL_USE_SSL'] = False
     mail.init_app(app)
+    mail_queue.init_app(app)
 
 def send_email(subject, recipient, body,html=None):
-    """Send an email using the initialized mail system."""
+    """Send an email, or queue it for the background sender when the mail queue is enabled."""
     msg = Message(
         subject=subject,
         sender=current_app.config['MAIL_USERNAME'],
@@ -28,4 +50,7 @@ def send_email(subject, recipient, body,html=None):
         body=body,
         html=html
     )
-    mail.send(msg)
+    if QUEUE_ENABLED:
+        mail_queue.enqueue(msg)
+    else:
+        mail.send(msg)
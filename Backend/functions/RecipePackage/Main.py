@@ -1,17 +1,30 @@
-from flask import Flask
-from flask_cors import CORS
-import os,json,datetime
-from RecipePackage.Auth.auth import authp
-from RecipePackage.Models import config
-from RecipePackage.Mail.mailsender import init_mail, send_email
-from RecipePackage.Models.models import db
-from RecipePackage.Models.config import apply_config
-from flask_migrate import Migrate
-from flask_jwt_extended import JWTManager
-from authlib.integrations.flask_client import OAuth
-from RecipePackage.oauth import oauth, configure_oauth
-from RecipePackage.Recipes.recipes import recipe
-from RecipePackage.Airecipe.airecipe import airecipe
+import os,json,datetime,hmac
+from RecipePackage import startup, metrics
+
+# Each import is timed so cold-start cost per module shows up in the startup profile.
+# Heavy dependencies (pandas, Gemini, OAuth client) are loaded by the blueprints on first use.
+with startup.timed('flask'):
+    from flask import Flask, jsonify, request
+    from flask_cors import CORS
+with startup.timed('RecipePackage.Models'):
+    from RecipePackage.Models import config
+    from RecipePackage.Models.models import db
+    from RecipePackage.Models.config import apply_config
+    from RecipePackage.Models.pool import gauges as pool_gauges, warm_up as warm_up_pool
+with startup.timed('flask_migrate'):
+    from flask_migrate import Migrate
+with startup.timed('flask_jwt_extended'):
+    from flask_jwt_extended import JWTManager
+with startup.timed('RecipePackage.Mail'):
+    from RecipePackage.Mail.mailsender import init_mail, send_email
+with startup.timed('RecipePackage.oauth'):
+    from RecipePackage.oauth import configure_oauth
+with startup.timed('RecipePackage.Auth'):
+    from RecipePackage.Auth.auth import authp
+with startup.timed('RecipePackage.Recipes'):
+    from RecipePackage.Recipes.recipes import recipe
+with startup.timed('RecipePackage.Airecipe'):
+    from RecipePackage.Airecipe.airecipe import airecipe
 
 
 
@@ -34,13 +47,25 @@ app.config['JWT_SECRET_KEY'] = SECRET_KEY
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = datetime.timedelta(days=30)
 
 db.init_app(app)
+with app.app_context():
+    engine = db.engine
+metrics.register('db_pool', lambda: pool_gauges(engine))
+if app.config.get('DB_POOL_WARM_UP'):
+    # Opened now, while the instance starts, instead of by the first requests
+    with startup.timed('db.warm_up'):
+        warm_up_pool(engine, app.config['DB_POOL_WARM_UP'])
 #CORS(app)
 CORS(app, resources={r"/*": {"origins": "*"}})  # Allow all origins
 
 migrate = Migrate(app, db)
 
-with app.app_context():
+# Tables are created out of band (`flask --app Start_Server init-db` or migrations),
+# not on every cold start
+@app.cli.command('init-db')
+def init_db():
+    """Create any missing tables."""
     db.create_all()
+    print("Database tables created")
 
 app.config.from_object(config)
 
@@ -68,5 +93,21 @@ init_mail(app)
 def index():
     return 'Hello from the main application', 200
 
+# Internal cache / queue / pool counters: only served when "metrics": {"enabled": true}
+# is set, and then only to callers sending "Authorization: Bearer <metrics.token>"
+metrics_conf = config_data.get('metrics', {})
+if metrics_conf.get('enabled', False):
+    @app.route('/metrics')
+    def metrics_snapshot():
+        token = metrics_conf.get('token', '')
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not token or not hmac.compare_digest(supplied, token):
+            return jsonify({'error': 'Unauthorized'}), 401
+        return jsonify(metrics.snapshot()), 200
+
+
+metrics.register('startup_ms', startup.stats)
+startup.report()
+
 
 
@@ -1,6 +1,8 @@
 import json
 import os
 
+from RecipePackage.Models.pool import DEFAULTS as POOL_DEFAULTS, engine_options
+
 def apply_config(app):
     config_path = os.path.join(os.path.dirname(__file__), '../../config.json')
     with open(config_path) as f:
@@ -12,4 +14,8 @@ def apply_config(app):
     f"@{db_conf['host']}:{db_conf['port']}/{db_conf['name']}"
 )
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    # Pool sizing, recycle and pre-ping from "database": {"pool": {...}}
+    pool_conf = db_conf.get("pool", {})
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(pool_conf)
+    app.config["DB_POOL_WARM_UP"] = pool_conf.get("warm_up", POOL_DEFAULTS["warm_up"])
     app.config["SECRET_KEY"] = config["secret_key"]
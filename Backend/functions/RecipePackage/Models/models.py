@@ -1,3 +1,4 @@
+import datetime
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.dialects.mysql import LONGBLOB
 db = SQLAlchemy()
@@ -12,7 +13,11 @@ class User(db.Model):
     phone = db.Column(db.String(15), unique=True, nullable=True)
     age = db.Column(db.Integer)
     bio = db.Column(db.String(500))
-    image = db.Column(LONGBLOB)
+    # Blobs are only read by /auth/avatar, not by every User query
+    image = db.deferred(db.Column(LONGBLOB))
+    thumbnail = db.deferred(db.Column(db.LargeBinary(length=2**24 - 1)))  # MEDIUMBLOB on MySQL; BLOB caps at 64 KB
+    image_type = db.Column(db.String(32))
+    image_hash = db.Column(db.String(64))  # sha256 of `image`, the avatar ETag
 
     # def __repr__(self):
         # return f"<User {self.email}>"
@@ -23,9 +28,9 @@ class UploadedRecipe(db.Model):
     ingredients = db.Column(db.Text, nullable=False)
     instructions = db.Column(db.Text, nullable=False)
     image_url = db.Column(db.String(500))
-    cuisine = db.Column(db.String(100))      # ✅ New
-    course = db.Column(db.String(100))       # ✅ New
-    diet = db.Column(db.String(100))         # ✅ New
+    cuisine = db.Column(db.String(100), index=True)      # ✅ New
+    course = db.Column(db.String(100), index=True)       # ✅ New
+    diet = db.Column(db.String(100), index=True)         # ✅ New
     prep_time = db.Column(db.String(50))     # ✅ New
 
     def __init__(self, title, ingredients, instructions, image_url=None, cuisine='', course='', diet='', prep_time=''):
@@ -40,7 +45,24 @@ class UploadedRecipe(db.Model):
 
 class Aisavedrecipe(db.Model):
     recipe_id=db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     recipe_name = db.Column(db.String(255), nullable=False)
     recipe=db.Column(db.JSON, nullable=False)
-    
\ No newline at end of file
+    
+
+class AiResponseCache(db.Model):
+    __tablename__ = 'ai_response_cache'
+
+    key = db.Column(db.String(64), primary_key=True)  # sha256 of the normalized prompt
+    kind = db.Column(db.String(20), nullable=False)
+    response = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.datetime.utcnow, index=True)
+
+
+class OtpCode(db.Model):
+    __tablename__ = 'otp_codes'
+
+    key = db.Column(db.String(190), primary_key=True)  # "<purpose>:<email>"
+    code_hash = db.Column(db.String(64), nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
@@ -0,0 +1,118 @@
+"""
+Connection pool settings, gauges and warm-up for the MySQL engine.
+
+Configured from "database": {"pool": {...}} in config.json; every key is
+optional and the defaults suit a small serverless instance.
+"""
+import threading
+import time
+from collections import deque
+
+from sqlalchemy.pool import QueuePool
+
+DEFAULTS = {
+    'pool_size': 5,
+    'max_overflow': 5,
+    'pool_timeout': 10,      # seconds to wait for a free connection
+    'pool_recycle': 280,     # below MySQL/proxy idle timeouts, so idle instances don't hit dead sockets
+    'pool_pre_ping': True,   # checks a connection before handing it out after idle periods
+    'connect_timeout': 5,
+    'warm_up': 0,            # connections to open at start-up
+}
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self._waits = deque(maxlen=512)
+
+    def record(self, seconds, ok=True):
+        with self._lock:
+            if ok:
+                self.checkouts += 1
+                self._waits.append(seconds)
+            else:
+                self.timeouts += 1
+
+    def snapshot(self):
+        with self._lock:
+            waits = sorted(self._waits)
+            stats = {'checkouts': self.checkouts, 'checkout_timeouts': self.timeouts}
+        if waits:
+            stats['checkout_wait_ms'] = {
+                'avg': round(1000 * sum(waits) / len(waits), 2),
+                'p95': round(1000 * waits[min(len(waits) - 1, int(len(waits) * 0.95))], 2),
+                'max': round(1000 * waits[-1], 2),
+            }
+        return stats
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits (including opening a new connection)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool; keep counting into the same stats
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            self.stats.record(time.perf_counter() - started, ok=False)
+            raise
+        self.stats.record(time.perf_counter() - started)
+        return connection
+
+
+def engine_options(pool_conf):
+    """SQLALCHEMY_ENGINE_OPTIONS for the given "pool" config section."""
+    conf = {**DEFAULTS, **pool_conf}
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': conf['pool_size'],
+        'max_overflow': conf['max_overflow'],
+        'pool_timeout': conf['pool_timeout'],
+        'pool_recycle': conf['pool_recycle'],
+        'pool_pre_ping': conf['pool_pre_ping'],
+        'connect_args': {'connect_timeout': conf['connect_timeout']},
+    }
+
+
+def gauges(engine):
+    """Current pool occupancy plus the checkout counters."""
+    pool = engine.pool
+    stats = {
+        'size': pool.size(),
+        'in_use': pool.checkedout(),
+        'idle': pool.checkedin(),
+        # QueuePool counts overflow from -pool_size until the pool is full
+        'overflow': max(pool.overflow(), 0),
+    }
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(pool.stats.snapshot())
+    return stats
+
+
+def warm_up(engine, connections):
+    """Opens `connections` pooled connections up front so the first requests don't pay for them."""
+    # Overflow connections are closed as soon as they are returned, so only pool_size stay warm
+    connections = min(connections, engine.pool.size())
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(engine.connect())
+    except Exception as e:
+        print(f"Database warm-up stopped after {len(opened)} connection(s): {e!r}")
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
@@ -0,0 +1,149 @@
+"""
+Columnar (Arrow IPC) copies of the recipe and ingredient CSVs.
+
+Build them before deploying, from Backend/functions:
+
+    python -m RecipePackage.Recipes.artifacts
+
+Each artifact records the size, mtime and sha256 of the CSV it was built
+from. At runtime the artifact is memory-mapped instead of parsing the CSV,
+unless pyarrow is not installed or the CSV next to it no longer matches,
+in which case the CSV is read as before. The CSV is only hashed when its
+size or mtime differ from the recorded ones (e.g. after a fresh checkout).
+String columns stay Arrow-backed (`string[pyarrow]`), so their data is
+read from the mapped file rather than copied into Python strings.
+"""
+import csv
+import hashlib
+import os
+import sys
+import time
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # CSV only
+    pa = None
+
+FORMAT_VERSION = b'1'
+
+if pa is not None:
+    _ARROW_STRINGS = {
+        pa.string(): pd.StringDtype('pyarrow'),
+        pa.large_string(): pd.StringDtype('pyarrow'),
+    }
+
+
+def artifact_path(csv_path):
+    return os.path.splitext(csv_path)[0] + '.arrow'
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_stamp(csv_path):
+    stat = os.stat(csv_path)
+    return {b'source_size': str(stat.st_size).encode(), b'source_mtime_ns': str(stat.st_mtime_ns).encode()}
+
+
+def _write(table, csv_path):
+    metadata = {
+        b'source_sha256': file_sha256(csv_path).encode(),
+        b'format_version': FORMAT_VERSION,
+        **_source_stamp(csv_path),
+    }
+    table = table.replace_schema_metadata(metadata)
+    path = artifact_path(csv_path)
+    tmp_path = path + '.tmp'
+    # Uncompressed so the file can be memory-mapped as is
+    with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _open(csv_path):
+    """The memory-mapped artifact table for `csv_path`, or None if missing or stale."""
+    if pa is None:
+        return None
+    path = artifact_path(csv_path)
+    if not os.path.exists(path):
+        return None
+
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    metadata = table.schema.metadata or {}
+    if metadata.get(b'format_version') != FORMAT_VERSION:
+        print(f"Ignoring {path}: unknown format")
+        return None
+    # Without the CSV (artifact-only deploy) the artifact is the source of truth
+    if os.path.exists(csv_path) and not _matches_source(metadata, csv_path):
+        print(f"Ignoring stale {path}: {os.path.basename(csv_path)} has changed")
+        return None
+    return table
+
+
+def _matches_source(metadata, csv_path):
+    """Whether the artifact was built from this CSV; hashes it only if size or mtime changed."""
+    stamp = _source_stamp(csv_path)
+    if all(metadata.get(key) == value for key, value in stamp.items()):
+        return True
+    return metadata.get(b'source_sha256', b'').decode() == file_sha256(csv_path)
+
+
+def read_ingredient_names(file_path):
+    """Ingredient names from the `id;name;...` CSV, in file order."""
+    names = []
+    with open(file_path, mode='r', encoding='utf-8') as file:
+        reader = csv.reader(file, delimiter=';')
+        for row in reader:
+            if len(row) > 1:
+                names.append(row[1].strip())
+    return names
+
+
+def load_recipes_frame(csv_path):
+    """The recipe dataset as a DataFrame, from the artifact when it is fresh."""
+    table = _open(csv_path)
+    if table is not None:
+        # Strings keep pointing into the mapped file instead of becoming Python objects
+        return table.to_pandas(types_mapper=_ARROW_STRINGS.get)
+    return pd.read_csv(csv_path)
+
+
+def load_ingredient_names(csv_path):
+    """Ingredient names, from the artifact (already deduplicated) when it is fresh."""
+    table = _open(csv_path)
+    if table is not None:
+        return table.column('name').to_pylist()
+    return read_ingredient_names(csv_path)
+
+
+def build(recipes_csv, ingredients_csv):
+    """Converts both CSVs to Arrow artifacts next to them, returns their paths."""
+    if pa is None:
+        raise RuntimeError('pyarrow is required to build the dataset artifacts')
+
+    from RecipePackage.Recipes.catalogue import IngredientCatalogue
+
+    frame = pd.read_csv(recipes_csv)
+    names = IngredientCatalogue(read_ingredient_names(ingredients_csv)).names
+    return [
+        _write(pa.Table.from_pandas(frame, preserve_index=False), recipes_csv),
+        _write(pa.table({'name': pa.array(names, type=pa.string())}), ingredients_csv),
+    ]
+
+
+if __name__ == '__main__':
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    recipes_csv = sys.argv[1] if len(sys.argv) > 1 else os.path.join(base_dir, 'cuisines.csv')
+    ingredients_csv = sys.argv[2] if len(sys.argv) > 2 else os.path.join(base_dir, 'ingredient_6L.csv')
+    started = time.perf_counter()
+    for path in build(recipes_csv, ingredients_csv):
+        print(f"Wrote {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+    print(f"Done in {time.perf_counter() - started:.1f}s")
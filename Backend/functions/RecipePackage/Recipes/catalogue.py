@@ -0,0 +1,65 @@
+import bisect
+import hashlib
+import json
+import threading
+
+from RecipePackage import startup
+
+# Sorts after every real character, closes a prefix range for bisect
+_PREFIX_END = '\U0010ffff'
+
+
+class IngredientCatalogue:
+    """
+    Deduplicated ingredient names sorted case-insensitively, with a parallel
+    list of lowercase keys so prefix lookups are two bisects.
+    """
+
+    def __init__(self, names):
+        self.names = tuple(sorted({n for n in names if n}, key=lambda n: (n.lower(), n)))
+        self.keys = tuple(n.lower() for n in self.names)
+
+        digest = hashlib.sha1()
+        for name in self.names:
+            digest.update(name.encode('utf-8'))
+            digest.update(b'\0')
+        self.etag = digest.hexdigest()
+
+    def __len__(self):
+        return len(self.names)
+
+    def prefix_range(self, prefix):
+        """Returns the (start, stop) slice of names starting with `prefix`."""
+        prefix = prefix.strip().lower()
+        start = bisect.bisect_left(self.keys, prefix)
+        stop = bisect.bisect_right(self.keys, prefix + _PREFIX_END, lo=start)
+        return start, stop
+
+    def iter_json(self, chunk_size=2000):
+        """Yields the full catalogue as `{"ingredients": [...]}` in chunks."""
+        yield '{"ingredients": ['
+        for start in range(0, len(self.names), chunk_size):
+            chunk = ', '.join(json.dumps(n) for n in self.names[start:start + chunk_size])
+            yield chunk if start == 0 else ', ' + chunk
+        yield ']}'
+
+
+def read_catalogue(file_path):
+    """Reads the ingredient CSV (or its prebuilt artifact)."""
+    from RecipePackage.Recipes.artifacts import load_ingredient_names
+    return IngredientCatalogue(load_ingredient_names(file_path))
+
+
+_catalogue = None
+_lock = threading.Lock()
+
+
+def get_catalogue(file_path):
+    """Loads the catalogue on first use and keeps it for the life of the process."""
+    global _catalogue
+    if _catalogue is None:
+        with _lock:
+            if _catalogue is None:
+                with startup.timed('recipes.catalogue'):
+                    _catalogue = read_catalogue(file_path)
+    return _catalogue
@@ -0,0 +1,211 @@
+import difflib
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from RecipePackage.Recipes.ingredient_index import IngredientIndex
+from RecipePackage.Recipes.name_index import NameIndex, tokenize
+from RecipePackage.Recipes.similarity import SimilarityEngine
+from RecipePackage.Recipes.facets import Facet
+from RecipePackage.Recipes.suggest import Suggester
+from RecipePackage.Recipes.ranking import top_k
+from RecipePackage.Recipes.artifacts import load_recipes_frame
+
+BROWSE_COLUMNS = ['name', 'prep_time', 'image_url', 'cuisine', 'course', 'diet']
+INGREDIENT_RESULT_COLUMNS = BROWSE_COLUMNS + ['ingredients']
+FILLER_WORDS = re.compile(r'\b(how to|make|cook|prepare|recipe|for|a|the|of|with)\b')
+
+
+def clean_field(text):
+    """Collapses tabs/newlines and repeated spaces in a free-text field."""
+    if pd.isna(text): return ''
+    text = re.sub(r'[\t\r\n]+', ' ', text)
+    return re.sub(r'\s{2,}', ' ', text).strip()
+
+
+def name_key(text):
+    """Lower-cased name without filler words ("recipe", "how to make", ...) and repeated spaces."""
+    return ' '.join(FILLER_WORDS.sub(' ', text.lower()).split())
+
+
+def split_ingredients(text):
+    """Split ingredients into list: by numbered bullets or '•' or '-' following a word."""
+    if not isinstance(text, str):
+        return []
+    parts = re.split(r'(?<=[a-zA-Z])\s*(?=\d|\•|\-)', text)
+    return [re.sub(r'\s{2,}', ' ', i).strip() for i in parts if i.strip()]
+
+
+class RecipeDataset:
+    """
+    The cuisines.csv frame plus every index built from it. Endpoints read
+    one instance for the whole request, so a reload swaps all of it at once.
+    """
+
+    def __init__(self, df, generation=0):
+        self.df = df
+        self.generation = generation
+
+        # Ingredient -> recipe rows, built once so searches only touch candidate recipes
+        self.ingredient_index = IngredientIndex(df['ingredients'].tolist())
+        # Name word -> recipe rows, for ranked /search
+        self.name_index = NameIndex(df['name'].tolist())
+        # Filter columns encoded once as categorical codes
+        self.facets = {column: Facet(df[column]) for column in ('cuisine', 'course', 'diet')}
+
+        # Rows that can be listed in results (no missing fields)
+        self.browse_listable = df[BROWSE_COLUMNS].notna().all(axis=1).to_numpy()
+        self.ingredient_listable = df[INGREDIENT_RESULT_COLUMNS].notna().all(axis=1).to_numpy()
+
+        self.name_keys = df['name'].str.lower().to_numpy()
+        # Lowercase name -> first row with that name, for O(1) detail lookups
+        self.name_rows = {}
+        for row, key in enumerate(self.name_keys):
+            if isinstance(key, str):
+                self.name_rows.setdefault(key, row)
+        self._payloads = {}
+        self.diet_keys = df['diet'].fillna('').str.strip().str.lower().to_numpy()
+
+        # Ingredient-overlap similarity, scored against every recipe at once
+        self.similarity = SimilarityEngine(
+            self.ingredient_index,
+            cuisine_codes=self.facets['cuisine'].raw_codes,
+            course_codes=self.facets['course'].raw_codes,
+            name_keys=self.name_keys,
+            vegetarian=self.diet_keys == 'vegetarian',
+            listable=self.browse_listable,
+        )
+
+        self._suggester = None
+        self._suggester_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.df)
+
+    def records(self, positions, with_ingredients=False, **extra):
+        """Result records for the given row positions, in that order."""
+        columns = INGREDIENT_RESULT_COLUMNS if with_ingredients else BROWSE_COLUMNS
+        frame = self.df.iloc[np.asarray(positions, dtype=np.intp)][columns]
+        return frame.assign(**extra).to_dict(orient='records')
+
+    def browse(self, cuisines, courses, diets):
+        """Listable rows matching the filters (compared lower/stripped), in dataset order."""
+        mask = self.browse_listable
+        for column, values in (('cuisine', cuisines), ('course', courses), ('diet', diets)):
+            if values:
+                mask = mask & self.facets[column].mask(values)
+        return np.flatnonzero(mask)
+
+    def search(self, tokens, cuisines, courses, diets):
+        """
+        Returns (total, rows): the number of recipes whose names match every
+        token and the exact filters, and the listable ones ranked by BM25.
+        """
+        rows, scores = self.name_index.search(tokens)
+
+        # Apply filters if present, on the candidate rows only
+        for column, values in (('cuisine', cuisines), ('course', courses), ('diet', diets)):
+            if values and len(rows):
+                keep = self.facets[column].exact(values, rows)
+                rows, scores = rows[keep], scores[keep]
+        total = len(rows)
+
+        listable = self.browse_listable[rows]
+        rows, scores = rows[listable], scores[listable]
+        return total, rows[np.argsort(-scores, kind='stable')]
+
+    def match_ingredients(self, ingredients, start, end):
+        """
+        Returns (total, rows, scores) for the [start:end) page of recipes
+        ranked by match_percent. Scores live in request-local arrays; the
+        shared frame is never written to.
+        """
+        rows, scores = self.ingredient_index.score(ingredients)
+        total = len(rows)
+
+        listable = self.ingredient_listable[rows]
+        rows, scores = rows[listable], scores[listable]
+        order = top_k(scores, end)[start:]
+        return total, rows[order], scores[order]
+
+    def find_similar_target(self, name):
+        """Row of the exact (case-insensitive) name match, else the first partial match."""
+        row = self.find(name)
+        if row is None:
+            matches = np.flatnonzero(self.df['name'].str.lower().str.contains(name.lower(), regex=False, na=False).to_numpy())
+            if len(matches):
+                row = int(matches[0])
+        return row
+
+    def find(self, name):
+        """Row position of the recipe with this name (case-insensitive), or None."""
+        return self.name_rows.get(name.lower())
+
+    def closest(self, name, min_ratio=0.85, candidates=50):
+        """
+        Returns (row, confidence) for the recipe whose name best matches `name`,
+        or None below `min_ratio`. Exact names score 1.0; otherwise the best
+        BM25 candidates are compared by difflib ratio, with misspelt words
+        first snapped to the nearest word in the name vocabulary. Both sides
+        are compared without filler words, so "how to make masala karela"
+        matches "Masala Karela Recipe".
+        """
+        row = self.find(' '.join(name.split()))
+        if row is not None:
+            return row, 1.0
+        key = name_key(name)
+        if not key:
+            return None
+
+        words = []
+        for word in tokenize(key):
+            if self.name_index.has_prefix(word):
+                words.append(word)
+            else:
+                words.extend(difflib.get_close_matches(word, self.name_index.vocab, n=1, cutoff=0.8))
+        rows, scores = self.name_index.search(words)
+        if not len(rows):
+            return None
+
+        best_row, best_ratio = None, 0.0
+        matcher = difflib.SequenceMatcher(b=key, autojunk=False)
+        for row in rows[top_k(scores, candidates)]:
+            candidate = self.name_keys[row]
+            if not isinstance(candidate, str):
+                continue
+            matcher.set_seq1(name_key(candidate))
+            ratio = matcher.ratio()
+            if ratio > best_ratio:
+                best_row, best_ratio = int(row), ratio
+        if best_ratio < min_ratio:
+            return None
+        return best_row, best_ratio
+
+    def payload(self, row):
+        """
+        The /recipe detail body for a row, cleaned on first request and then
+        memoised (at most one entry per recipe).
+        """
+        result = self._payloads.get(row)
+        if result is None:
+            result = self.df.iloc[row].to_dict()
+            for field in ['description', 'instructions']:
+                result[field] = clean_field(result.get(field, ''))
+            result['ingredients'] = split_ingredients(result.get('ingredients', ''))
+            self._payloads[row] = result
+        return result
+
+    def suggester(self, catalogue):
+        """Typeahead index, built on first use since it needs the ingredient catalogue."""
+        if self._suggester is None:
+            with self._suggester_lock:
+                if self._suggester is None:
+                    self._suggester = Suggester(self.df['name'].tolist(), catalogue.names, self.ingredient_index)
+        return self._suggester
+
+
+def load_dataset(path, generation=0):
+    """Reads the recipe dataset (memory-mapped artifact when fresh, CSV otherwise) and indexes it."""
+    return RecipeDataset(load_recipes_frame(path), generation=generation)
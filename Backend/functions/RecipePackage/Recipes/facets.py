@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+
+class Facet:
+    """
+    A categorical filter column (cuisine, course, diet) encoded once at load.
+    `codes` are over the lower/stripped values used by the browse filters,
+    `raw_codes` over the values exactly as stored in the CSV. Missing is -1.
+    """
+
+    def __init__(self, values):
+        normalized = pd.Categorical(values.str.lower().str.strip())
+        self.codes = normalized.codes
+        self._lookup = {v: i for i, v in enumerate(normalized.categories)}
+
+        raw = pd.Categorical(values)
+        self.raw_codes = raw.codes
+        self._raw_lookup = {v: i for i, v in enumerate(raw.categories)}
+
+        # Sorted distinct values for the /cuisines, /courses, /diets listings
+        self.values = [str(v) for v in raw.categories]
+
+    def mask(self, wanted):
+        """Boolean row mask for the given values, compared lower/stripped."""
+        ids = [self._lookup[v] for v in {w.lower().strip() for w in wanted} if v in self._lookup]
+        return np.isin(self.codes, ids)
+
+    def exact(self, wanted, rows):
+        """Which of `rows` hold one of the given values exactly."""
+        ids = [self._raw_lookup[v] for v in set(wanted) if v in self._raw_lookup]
+        return np.isin(self.raw_codes[rows], ids)
@@ -0,0 +1,50 @@
+import numpy as np
+
+
+def normalize_ingredient(text):
+    """Normalize an ingredient the same way for recipes and user queries."""
+    return text.strip().lower()
+
+
+def _frozen(values):
+    # The index is shared by every request thread, so make it read-only
+    array = np.asarray(values, dtype=np.int32)
+    array.setflags(write=False)
+    return array
+
+
+class IngredientIndex:
+    """
+    Inverted index from a normalized ingredient to the recipe rows that use it.
+    Built once from the dataset's comma separated `ingredients` column.
+    """
+
+    def __init__(self, ingredients):
+        postings = {}
+        counts = np.zeros(len(ingredients), dtype=np.int32)
+
+        for row, raw in enumerate(ingredients):
+            if not isinstance(raw, str):
+                continue
+            parts = raw.split(',')
+            # match_percent is divided by the raw entry count, duplicates included
+            counts[row] = len(parts)
+            for token in {normalize_ingredient(p) for p in parts}:
+                postings.setdefault(token, []).append(row)
+
+        self.postings = {token: _frozen(rows) for token, rows in postings.items()}
+        self.counts = _frozen(counts)
+
+    def score(self, ingredients):
+        """
+        Returns (rows, scores) for every recipe sharing at least one of the given
+        ingredients, rows in dataset order. The score is the fraction of the
+        recipe's ingredients the user has.
+        """
+        tokens = {normalize_ingredient(i) for i in ingredients if isinstance(i, str)}
+        hits = [self.postings[t] for t in tokens if t and t in self.postings]
+        if not hits:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float64)
+
+        rows, matched = np.unique(np.concatenate(hits), return_counts=True)
+        return rows, matched / self.counts[rows]
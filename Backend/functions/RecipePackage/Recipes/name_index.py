@@ -0,0 +1,82 @@
+import bisect
+import math
+import re
+
+import numpy as np
+
+_PREFIX_END = '\U0010ffff'
+_WORD = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return _WORD.findall(text.lower())
+
+
+class NameIndex:
+    """
+    Word -> posting list index over recipe names with BM25 ranking.
+    A query token matches any name word it is a prefix of, so "pan" still
+    finds "Paneer"; multi-token queries intersect the posting lists.
+    """
+
+    def __init__(self, names, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+
+        postings = {}
+        lengths = np.zeros(len(names), dtype=np.float32)
+        for row, name in enumerate(names):
+            if not isinstance(name, str):
+                continue
+            words = tokenize(name)
+            lengths[row] = len(words)
+            for word in words:
+                tfs = postings.setdefault(word, {})
+                tfs[row] = tfs.get(row, 0) + 1
+
+        self.vocab = sorted(postings)
+        self.rows = [np.fromiter(postings[w].keys(), dtype=np.int32) for w in self.vocab]
+        self.tfs = [np.fromiter(postings[w].values(), dtype=np.float32) for w in self.vocab]
+        self.size = len(names)
+        self.avg_length = float(lengths.mean()) if len(names) else 0.0
+        self.length_norm = (1 - b + b * lengths / self.avg_length) if self.avg_length else lengths
+
+    def _term(self, token):
+        """Rows and summed term frequencies for every word starting with `token`."""
+        start = bisect.bisect_left(self.vocab, token)
+        stop = bisect.bisect_right(self.vocab, token + _PREFIX_END, lo=start)
+        if start == stop:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        if stop - start == 1:
+            return self.rows[start], self.tfs[start]
+        rows, inverse = np.unique(np.concatenate(self.rows[start:stop]), return_inverse=True)
+        return rows, np.bincount(inverse, weights=np.concatenate(self.tfs[start:stop]))
+
+    def has_prefix(self, token):
+        """True if some name word starts with `token`."""
+        start = bisect.bisect_left(self.vocab, token)
+        return start < len(self.vocab) and self.vocab[start].startswith(token)
+
+    def _bm25(self, rows, tfs, df):
+        idf = math.log(1 + (self.size - df + 0.5) / (df + 0.5))
+        return idf * tfs * (self.k1 + 1) / (tfs + self.k1 * self.length_norm[rows])
+
+    def search(self, tokens):
+        """
+        Returns (rows, scores) for recipes whose names match every token,
+        rows in dataset order.
+        """
+        words = [w for token in tokens for w in tokenize(token)]
+        if not words:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float64)
+
+        # Start from the rarest term so the running intersection stays small
+        terms = sorted((self._term(w) for w in set(words)), key=lambda t: len(t[0]))
+        rows, tfs = terms[0]
+        scores = self._bm25(rows, tfs, len(rows)).astype(np.float64)
+        for term_rows, term_tfs in terms[1:]:
+            if not len(rows):
+                break
+            rows, left, right = np.intersect1d(rows, term_rows, assume_unique=True, return_indices=True)
+            scores = scores[left] + self._bm25(rows, term_tfs[right], len(term_rows))
+        return rows, scores
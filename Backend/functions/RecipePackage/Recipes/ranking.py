@@ -0,0 +1,20 @@
+import numpy as np
+
+
+def top_k(scores, k):
+    """
+    Positions of the k highest scores, best first, with ties kept in their
+    original order. Only the values that can reach the top k are sorted.
+    """
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+
+    if k < n:
+        kth = np.partition(scores, n - k)[n - k]
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(n)
+
+    order = np.argsort(-scores[candidates], kind='stable')
+    return candidates[order][:k]
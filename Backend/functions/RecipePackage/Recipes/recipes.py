@@ -1,17 +1,57 @@
-from flask import  jsonify, request,Blueprint
-import pandas as pd
+from flask import  jsonify, request,Blueprint,Response
 import os
+import json
+import threading
 
 from RecipePackage.Models.models import UploadedRecipe, db
+from RecipePackage.Recipes.catalogue import get_catalogue
+from RecipePackage.cache import TTLCache
+from RecipePackage import metrics, startup
 
 
 import re
-import csv
 
 # Load CSV
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATASET_PATH = os.path.join(BASE_DIR, 'cuisines.csv')
-df = pd.read_csv(DATASET_PATH)
+INGREDIENTS_PATH = os.path.join(BASE_DIR, 'ingredient_6L.csv')
+
+with open(os.path.join(BASE_DIR, '../../config.json')) as f:
+    cache_conf = json.load(f).get('recipe_cache', {})
+
+# Filtered + ordered row ids for browse/search queries; pages are slices of these
+query_cache = TTLCache(
+    max_entries=cache_conf.get('max_entries', 512),
+    ttl=cache_conf.get('ttl_seconds', 600),
+)
+metrics.register('recipe_query_cache', query_cache.stats)
+
+# The dataset (and pandas/numpy with it) is only loaded by the first request that needs it
+_dataset = None
+_dataset_lock = threading.Lock()
+
+
+def get_dataset():
+    """The recipe dataset with its indexes, loaded on first use."""
+    global _dataset
+    if _dataset is None:
+        with _dataset_lock:
+            if _dataset is None:
+                with startup.timed('recipes.dataset'):
+                    from RecipePackage.Recipes.dataset import load_dataset
+                    _dataset = load_dataset(DATASET_PATH)
+    return _dataset
+
+
+def reload_dataset(path=DATASET_PATH):
+    """Re-reads the recipe dataset, swaps in freshly built indexes and drops cached queries."""
+    global _dataset
+    from RecipePackage.Recipes.dataset import load_dataset
+    with _dataset_lock:
+        generation = _dataset.generation + 1 if _dataset is not None else 0
+        _dataset = load_dataset(path, generation=generation)
+        query_cache.clear()
+    return _dataset
 
 recipe=Blueprint('recipe',__name__)
 
@@ -20,19 +60,15 @@ recipe=Blueprint('recipe',__name__)
 
 @recipe.route("/cuisines", methods=["GET"])
 def get_cuisines():
-    print(DATASET_PATH)
-    cuisines = sorted(df['cuisine'].dropna().unique().tolist())
-    return jsonify({"cuisines": cuisines})
+    return jsonify({"cuisines": get_dataset().facets['cuisine'].values})
 
 @recipe.route("/courses", methods=["GET"])
 def get_courses():
-    courses = sorted(df['course'].dropna().unique().tolist())
-    return jsonify({"courses": courses})
+    return jsonify({"courses": get_dataset().facets['course'].values})
 
 @recipe.route("/diets", methods=["GET"])
 def get_diets():
-    diets = sorted(df['diet'].dropna().unique().tolist())
-    return jsonify({"diets": diets})
+    return jsonify({"diets": get_dataset().facets['diet'].values})
 
 # 🔥 New: Filter recipes by cuisine, course, diet
 @recipe.route("/recipes", methods=["GET"])
@@ -45,32 +81,27 @@ def get_recipes():
     limit = int(request.args.get('limit', 20))
     page = int(request.args.get('page', 1))
 
-    filtered = df.copy()
-
-    # Normalize and filter each
-    if cuisines:
-        cuisines = [c.lower().strip() for c in cuisines]
-        filtered = filtered[filtered['cuisine'].str.lower().str.strip().isin(cuisines)]
-
-    if courses:
-        courses = [c.lower().strip() for c in courses]
-        filtered = filtered[filtered['course'].str.lower().str.strip().isin(courses)]
-
-    if diets:
-        diets = [d.lower().strip() for d in diets]
-        filtered = filtered[filtered['diet'].str.lower().str.strip().isin(diets)]
-
-    result = filtered[['name', 'prep_time', 'image_url', 'cuisine', 'course', 'diet']].dropna()
+    ds = get_dataset()
+    key = (
+        'recipes', ds.generation,
+        tuple(sorted({c.lower().strip() for c in cuisines})),
+        tuple(sorted({c.lower().strip() for c in courses})),
+        tuple(sorted({d.lower().strip() for d in diets})),
+    )
+    rows = query_cache.get(key)
+    if rows is None:
+        # Normalize and filter each, as masks over the precomputed codes
+        rows = ds.browse(cuisines, courses, diets)
+        query_cache.put(key, rows)
 
     start = (page - 1) * limit
     end = start + limit
-    paginated = result.iloc[start:end]
 
     return jsonify({
-        "total": len(result),
+        "total": len(rows),
         "page": page,
         "limit": limit,
-        "recipes": paginated.to_dict(orient='records')
+        "recipes": ds.records(rows[start:end])
     })
 
 
@@ -80,28 +111,13 @@ def get_recipe_by_name():
     if not name:
         return jsonify({'error': 'Name parameter required'}), 400
 
-    recipe = df[df['name'].str.lower() == name.lower()]
-    if recipe.empty:
+    # One dict lookup; the cleaned payload is built once per recipe
+    ds = get_dataset()
+    row = ds.find(name)
+    if row is None:
         return jsonify({'error': 'Recipe not found'}), 404
 
-    result = recipe.iloc[0].to_dict()
-
-    # Clean text fields
-    def clean_field(text):
-        if pd.isna(text): return ''
-        text = re.sub(r'[\t\r\n]+', ' ', text)
-        return re.sub(r'\s{2,}', ' ', text).strip()
-
-    for field in ['description', 'instructions']:
-        result[field] = clean_field(result.get(field, ''))
-
-    # Split ingredients into list: split by comma or numbered bullets or '•' or newlines or tabs
-    ingredients_raw = result.get('ingredients', '')
-    ingredients_clean = re.split(r'(?<=[a-zA-Z])\s*(?=\d|\•|\-)', ingredients_raw)
-    ingredients_clean = [re.sub(r'\s{2,}', ' ', i).strip() for i in ingredients_clean if i.strip()]
-    result['ingredients'] = ingredients_clean
-
-    return jsonify(result)
+    return jsonify(ds.payload(row))
 
 @recipe.route('/search', methods=['GET'])
 def smart_search_recipe_by_name():
@@ -124,31 +140,21 @@ def smart_search_recipe_by_name():
     if not tokens:
         return jsonify({'error': 'No valid search terms found'}), 400
 
-    def matches_tokens(name):
-        name_lower = name.lower()
-        return all(token in name_lower for token in tokens)
-
-    # Filter dataset
-    filtered = df.copy()
-
-    # Apply name search
-    filtered = filtered[filtered['name'].apply(matches_tokens)]
-
-    # Apply filters if present
-    if cuisine_filters:
-        filtered = filtered[filtered['cuisine'].isin(cuisine_filters)]
-    if course_filters:
-        filtered = filtered[filtered['course'].isin(course_filters)]
-    if diet_filters:
-        filtered = filtered[filtered['diet'].isin(diet_filters)]
+    ds = get_dataset()
+    key = (
+        'search', ds.generation, tuple(tokens),
+        tuple(sorted(set(cuisine_filters))), tuple(sorted(set(course_filters))), tuple(sorted(set(diet_filters))),
+    )
+    cached = query_cache.get(key)
+    if cached is None:
+        # Ranked (BM25) by the name index; the whole ranking is cached so every later page is a slice
+        cached = ds.search(tokens, cuisine_filters, course_filters, diet_filters)
+        query_cache.put(key, cached)
+    total, rows = cached
 
-    total = len(filtered)
     start = (page - 1) * limit
     end = start + limit
 
-    result = filtered[['name', 'prep_time', 'image_url', 'cuisine', 'course', 'diet']].dropna()
-    paginated = result.iloc[start:end]
-
     return jsonify({
         'query': raw_query,
         'tokens': tokens,
@@ -160,7 +166,7 @@ def smart_search_recipe_by_name():
         'total': total,
         'page': page,
         'limit': limit,
-        'results': paginated.to_dict(orient='records')
+        'results': ds.records(rows[start:end])
     })
 
 
@@ -176,30 +182,17 @@ def search_by_ingredients():
     limit = int(request.args.get('limit', 20))
     page = int(request.args.get('page', 1))
 
-    def match_score(row):
-        recipe_ings = row['ingredients']
-        if not isinstance(recipe_ings, str):
-            return 0.0
-        recipe_ings = [ing.strip().lower() for ing in recipe_ings.split(',')]
-        match_count = sum(1 for ing in user_ingredients if ing.lower() in recipe_ings)
-        return match_count / len(recipe_ings) if recipe_ings else 0.0
-
-    df['match_percent'] = df.apply(match_score, axis=1)
-    filtered = df[df['match_percent'] > 0].sort_values(by='match_percent', ascending=False)
-
-    total = len(filtered)
+    ds = get_dataset()
     start = (page - 1) * limit
     end = start + limit
-
-    result = filtered[['name', 'prep_time', 'image_url', 'cuisine', 'course', 'diet', 'ingredients', 'match_percent']].dropna()
-    paginated = result.iloc[start:end]
+    total, rows, scores = ds.match_ingredients(user_ingredients, start, end)
 
     return jsonify({
         'matched_ingredients': user_ingredients,
         'total': total,
         'page': page,
         'limit': limit,
-        'recipes': paginated.to_dict(orient='records')
+        'recipes': ds.records(rows, with_ingredients=True, match_percent=scores)
     })
 
 
@@ -207,21 +200,49 @@ import re
 
 @recipe.route('/ingredients', methods=['GET'])
 def get_ingredients():
-    ingredients = []
-
-    # Build absolute path using os module
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    file_path = os.path.join(base_dir, 'ingredient_6L.csv')
-
-    # Read the CSV and collect ingredient names
-    with open(file_path, mode='r', encoding='utf-8') as file:
-        reader = csv.reader(file, delimiter=';')
-        for row in reader:
-            if len(row) > 1:
-                ingredients.append(row[1].strip())
-
-    # Return ingredients in expected format
-    return jsonify({"ingredients": ingredients})
+    # Parsed once per process and kept as a deduplicated, sorted list
+    catalogue = get_catalogue(INGREDIENTS_PATH)
+
+    # Prefix / paginated lookup: ?prefix=tom&limit=50&offset=0
+    if 'prefix' in request.args or 'limit' in request.args:
+        prefix = request.args.get('prefix', '')
+        limit = int(request.args.get('limit', 50))
+        offset = int(request.args.get('offset', 0))
+
+        start, stop = catalogue.prefix_range(prefix)
+        page_start = min(start + max(offset, 0), stop)
+        return jsonify({
+            "prefix": prefix,
+            "total": stop - start,
+            "offset": offset,
+            "limit": limit,
+            "ingredients": list(catalogue.names[page_start:min(page_start + max(limit, 0), stop)])
+        })
+
+    # Full catalogue for older clients, streamed and tagged so repeats get a 304
+    response = Response(catalogue.iter_json(), mimetype='application/json')
+    response.set_etag(catalogue.etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response.make_conditional(request)
+
+@recipe.route('/suggest', methods=['GET'])
+def suggest():
+    """Typeahead: /recipes/suggest?prefix=pan&limit=10&type=recipe|ingredient"""
+    prefix = request.args.get('prefix', '').strip()
+    if not prefix:
+        return jsonify({'error': 'Prefix parameter required'}), 400
+
+    kind = request.args.get('type')
+    if kind not in (None, 'recipe', 'ingredient'):
+        return jsonify({'error': 'type must be recipe or ingredient'}), 400
+
+    limit = min(max(int(request.args.get('limit', 10)), 1), 50)
+
+    suggester = get_dataset().suggester(get_catalogue(INGREDIENTS_PATH))
+    result = suggester.suggest(prefix, limit, kind)
+    result['prefix'] = prefix
+    return jsonify(result)
 
 @recipe.route('/similar-recipes', methods=['GET'])
 def get_similar_recipes():
@@ -229,69 +250,23 @@ def get_similar_recipes():
     if not name:
         return jsonify({'error': 'Recipe name required'}), 400
 
-    # Try exact match first
-    recipe_row = df[df['name'].str.lower() == name]
-
-    # If no exact match, try partial match
-    if recipe_row.empty:
-        partial_matches = df[df['name'].str.lower().str.contains(name)]
-        if not partial_matches.empty:
-            recipe_row = partial_matches.iloc[[0]]  # Pick first partial match
+    ds = get_dataset()
+    # Try exact match first, then the first partial match
+    row = ds.find_similar_target(name)
 
     # Still no match?
-    if recipe_row.empty:
+    if row is None:
         return jsonify({'error': f'Recipe not found for: {name}'}), 404
+    target_diet = ds.diet_keys[row]
 
-    recipe = recipe_row.iloc[0]
-    target_cuisine = recipe.get('cuisine', '')
-    target_course = recipe.get('course', '')
-    target_ingredients = recipe.get('ingredients', '').lower()
-    target_diet = recipe.get('diet', '').strip().lower()
-
-    # Exclude the original recipe
-    candidates = df[df['name'].str.lower() != recipe['name'].lower()].copy()
-
-    # 🔒 Apply diet filter: if vegetarian, show only vegetarian
-    if target_diet == 'vegetarian':
-        candidates = candidates[candidates['diet'].str.lower() == 'vegetarian']
-
-    # Similarity logic
-    def is_similar(row):
-        score = 0
-        if row['cuisine'] == target_cuisine:
-            score += 1
-        if row['course'] == target_course:
-            score += 1
-        if isinstance(row['ingredients'], str):
-            common = set(target_ingredients.split(',')).intersection(set(row['ingredients'].lower().split(',')))
-            if len(common) >= 2:
-                score += 1
-        return score >= 2
-
-    similar = candidates[candidates.apply(is_similar, axis=1)]
-
-    # 🔁 Fallback to ingredient-based if too few
-    if len(similar) < 15:
-        keywords = [word.strip() for word in target_ingredients.split(',') if word.strip()]
-        if keywords:
-            primary = keywords[0]
-            fallback = candidates[candidates['ingredients'].str.lower().str.contains(primary, na=False)]
-            similar = pd.concat([similar, fallback]).drop_duplicates(subset='name')
-
-    # 🔁 Fallback to random if still not enough
-    if len(similar) < 15:
-        remaining = candidates[~candidates['name'].isin(similar['name'])]
-        extra = remaining.sample(min(15 - len(similar), len(remaining)))
-        similar = pd.concat([similar, extra])
-
-    # Return final results
-    result = similar[['name', 'prep_time', 'image_url', 'cuisine', 'course', 'diet']].dropna().head(15)
+    # Top 15 by ingredient Jaccard + cuisine/course bonus (vegetarian stays vegetarian)
+    result = ds.records(ds.similarity.neighbours(row))
 
     return jsonify({
-        "original": recipe['name'],
+        "original": ds.df['name'].iat[row],
         "diet": target_diet or 'unknown',
         "similar_count": len(result),
-        "similar_recipes": result.to_dict(orient='records')
+        "similar_recipes": result
     })
 
 
@@ -323,35 +298,74 @@ def upload_recipe():
     db.session.add(new_recipe)
     db.session.commit()
 
-    return jsonify({'message': 'Recipe uploaded successfully!', 'recipe': {
-        'id': new_recipe.id,
-        'title': new_recipe.title,
-        'ingredients': new_recipe.ingredients,
-        'instructions': new_recipe.instructions,
-        'image_url': new_recipe.image_url,
-        'cuisine': new_recipe.cuisine,
-        'course': new_recipe.course,
-        'diet': new_recipe.diet,
-        'prep_time': new_recipe.prep_time
-    }}), 201
+    return jsonify({'message': 'Recipe uploaded successfully!', 'recipe': uploaded_recipe_dict(new_recipe)}), 201
+
+
+# List view of uploaded recipes; ingredients/instructions only come with the detail route
+UPLOADED_SUMMARY_COLUMNS = (
+    UploadedRecipe.id, UploadedRecipe.title, UploadedRecipe.image_url,
+    UploadedRecipe.cuisine, UploadedRecipe.course, UploadedRecipe.diet, UploadedRecipe.prep_time,
+)
+
+
+def uploaded_recipe_dict(r):
+    return {
+        'id': r.id,
+        'title': r.title,
+        'ingredients': r.ingredients,
+        'instructions': r.instructions,
+        'image_url': r.image_url,
+        'cuisine': r.cuisine,
+        'course': r.course,
+        'diet': r.diet,
+        'prep_time': r.prep_time
+    }
 
 
 @recipe.route('/api/recipes', methods=['GET'])
 def get_all_recipes():
-    recipes = UploadedRecipe.query.all()
-    return jsonify([
-        {
-            'id': r.id,
-            'title': r.title,
-            'ingredients': r.ingredients,
-            'instructions': r.instructions,
-            'image_url': r.image_url,
-            'cuisine': r.cuisine,
-            'course': r.course,
-            'diet': r.diet,
-            'prep_time': r.prep_time
-        } for r in recipes
-    ])
+    """
+    Uploaded recipes in id order, one page per call:
+    ?limit=24&cursor=<next_cursor from the previous page>&cuisine=..&course=..&diet=..
+    """
+    limit = min(max(int(request.args.get('limit', 24)), 1), 100)
+    cursor = request.args.get('cursor', type=int)
+
+    query = db.session.query(*UPLOADED_SUMMARY_COLUMNS)
+    for column, name in ((UploadedRecipe.cuisine, 'cuisine'), (UploadedRecipe.course, 'course'), (UploadedRecipe.diet, 'diet')):
+        values = [v.strip() for v in request.args.getlist(name) if v.strip()]
+        if values:
+            query = query.filter(column.in_(values))
+    # Keyset pagination: seek past the last id instead of OFFSET, so every page costs the same
+    if cursor is not None:
+        query = query.filter(UploadedRecipe.id > cursor)
+
+    rows = query.order_by(UploadedRecipe.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return jsonify({
+        'limit': limit,
+        'next_cursor': rows[-1].id if has_more else None,
+        'recipes': [
+            {
+                'id': r.id,
+                'title': r.title,
+                'image_url': r.image_url,
+                'cuisine': r.cuisine,
+                'course': r.course,
+                'diet': r.diet,
+                'prep_time': r.prep_time
+            } for r in rows
+        ]
+    })
+
+@recipe.route('/api/recipes/<int:id>', methods=['GET'])
+def get_uploaded_recipe(id):
+    recipe = UploadedRecipe.query.get(id)
+    if not recipe:
+        return jsonify({'error': 'Recipe not found'}), 404
+    return jsonify(uploaded_recipe_dict(recipe))
 
 @recipe.route('/api/recipes/<int:id>', methods=['DELETE'])
 def delete_recipe(id):
@@ -0,0 +1,61 @@
+from functools import lru_cache
+
+import numpy as np
+
+from RecipePackage.Recipes.ranking import top_k
+
+
+class SimilarityEngine:
+    """
+    Recipe-to-recipe similarity over binary ingredient vectors. Each recipe
+    is a CSR row of ingredient ids; overlap with every other recipe is one
+    bincount over the target's posting lists, turned into a Jaccard score
+    and combined with a +1 bonus each for the same cuisine and course.
+    """
+
+    def __init__(self, ingredient_index, cuisine_codes, course_codes, name_keys, vegetarian, listable, top_n=15):
+        postings = list(ingredient_index.postings.values())
+        self.size = len(ingredient_index.counts)
+        self.postings = postings
+
+        # CSR matrix: row -> ingredient ids
+        rows = np.concatenate(postings) if postings else np.empty(0, dtype=np.int32)
+        ids = np.repeat(np.arange(len(postings), dtype=np.int32), [len(p) for p in postings])
+        order = np.argsort(rows, kind='stable')
+        self.indices = ids[order]
+        self.indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=self.size))))
+        self.sizes = np.diff(self.indptr)
+
+        self.cuisine_codes = cuisine_codes
+        self.course_codes = course_codes
+        self.name_keys = name_keys
+        self.vegetarian = vegetarian
+        self.listable = listable
+        self.top_n = top_n
+        self.neighbours = lru_cache(maxsize=4096)(self._neighbours)
+
+    def scores(self, row):
+        """Similarity of every recipe to `row` (Jaccard + cuisine/course bonus)."""
+        ids = self.indices[self.indptr[row]:self.indptr[row + 1]]
+        if len(ids):
+            overlap = np.bincount(np.concatenate([self.postings[i] for i in ids]), minlength=self.size)
+            union = self.sizes + len(ids) - overlap
+            scores = np.divide(overlap, union, out=np.zeros(self.size), where=union > 0)
+        else:
+            scores = np.zeros(self.size)
+
+        for codes in (self.cuisine_codes, self.course_codes):
+            if codes[row] >= 0:
+                scores += codes == codes[row]
+        return scores
+
+    def _neighbours(self, row):
+        """The top_n most similar listable recipes, best first (cached per row)."""
+        scores = self.scores(row)
+        excluded = ~self.listable | (self.name_keys == self.name_keys[row])
+        if self.vegetarian[row]:
+            excluded |= ~self.vegetarian
+        scores[excluded] = -np.inf
+
+        picked = top_k(scores, self.top_n)
+        return tuple(picked[np.isfinite(scores[picked])])
@@ -0,0 +1,68 @@
+import bisect
+from functools import lru_cache
+
+import numpy as np
+
+_PREFIX_END = '\U0010ffff'
+_LENGTH_SPAN = 1000
+
+
+def _length(text):
+    return min(len(text), _LENGTH_SPAN - 1)
+
+
+class PrefixIndex:
+    """
+    Sorted lowercase keys with a rank per entry (lower is better). A prefix
+    is two bisects, then the best `limit` ranks inside that range are picked
+    with a partial sort.
+    """
+
+    def __init__(self, entries):
+        # entries: iterable of (text, rank); the best rank wins per lowercase key
+        best = {}
+        for text, rank in entries:
+            key = text.strip().lower()
+            if key and (key not in best or rank < best[key][1]):
+                best[key] = (text.strip(), rank)
+
+        self.keys = sorted(best)
+        self.texts = [best[k][0] for k in self.keys]
+        self.ranks = np.array([best[k][1] for k in self.keys], dtype=np.int64)
+        self.complete = lru_cache(maxsize=4096)(self._complete)
+
+    def _complete(self, prefix, limit):
+        start = bisect.bisect_left(self.keys, prefix)
+        stop = bisect.bisect_right(self.keys, prefix + _PREFIX_END, lo=start)
+        if stop - start > limit:
+            ranks = self.ranks[start:stop]
+            best = np.argpartition(ranks, limit - 1)[:limit]
+            picked = best[np.lexsort((best, ranks[best]))] + start
+        else:
+            picked = range(start, stop)
+        return tuple(self.texts[i] for i in picked)
+
+
+class Suggester:
+    """Typeahead over recipe names (shortest first) and ingredients (most used first)."""
+
+    def __init__(self, names, ingredient_names, ingredient_index):
+        self.recipes = PrefixIndex((name, _length(name)) for name in names if isinstance(name, str))
+
+        def ingredient_entries():
+            # Popularity is how many recipes use the ingredient; length breaks ties
+            for token, rows in ingredient_index.postings.items():
+                yield token, -len(rows) * _LENGTH_SPAN + _length(token)
+            for name in ingredient_names:
+                yield name, _length(name)
+
+        self.ingredients = PrefixIndex(ingredient_entries())
+
+    def suggest(self, prefix, limit=10, kind=None):
+        prefix = prefix.strip().lower()
+        result = {}
+        if kind in (None, 'recipe'):
+            result['recipes'] = list(self.recipes.complete(prefix, limit))
+        if kind in (None, 'ingredient'):
+            result['ingredients'] = list(self.ingredients.complete(prefix, limit))
+        return result
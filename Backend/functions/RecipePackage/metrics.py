@@ -0,0 +1,12 @@
+"""Process-wide registry of stats providers, served by the app's /metrics route."""
+
+_providers = {}
+
+
+def register(name, provider):
+    """`provider` is a zero-argument callable returning a JSON-serialisable dict."""
+    _providers[name] = provider
+
+
+def snapshot():
+    return {name: provider() for name, provider in _providers.items()}
@@ -1,11 +1,22 @@
-from authlib.integrations.flask_client import OAuth
 import os,json
-oauth = OAuth()
+import threading
+from RecipePackage import startup
+
+# The authlib client is built on the first Google login, not at import
+_app = None
+_oauth = None
+_lock = threading.Lock()
 
 
 
 def configure_oauth(app):
-    oauth.init_app(app)
+    global _app
+    _app = app
+
+
+def _register(app):
+    from authlib.integrations.flask_client import OAuth
+    oauth = OAuth(app)
     with open(os.path.join(os.path.dirname(__file__),'../config.json')) as a:
         data=json.load(a)["oauth"]
 
@@ -28,3 +39,15 @@ def configure_oauth(app):
     },
     server_metadata_url='https://accounts.google.com/.well-known/openid-configuration',
 )
+    return oauth
+
+
+def google_client():
+    """The Google OAuth client, registered on first use."""
+    global _oauth
+    if _oauth is None:
+        with _lock:
+            if _oauth is None:
+                with startup.timed('oauth.google'):
+                    _oauth = _register(_app)
+    return _oauth.create_client('google')
@@ -0,0 +1,31 @@
+"""
+Startup profiling: how long each module import and each lazily initialised
+subsystem took, in milliseconds. Printed once the app is built and served
+under /metrics.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+timings = {}
+_lock = threading.Lock()
+
+
+@contextmanager
+def timed(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        with _lock:
+            timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def report():
+    print("Startup profile (ms):")
+    for name, ms in sorted(timings.items(), key=lambda item: -item[1]):
+        print(f"  {name:<40} {ms:>8.1f}")
+
+
+def stats():
+    return dict(timings)
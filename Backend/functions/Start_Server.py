@@ -1,4 +1,8 @@
 from RecipePackage.Main import app
+from RecipePackage.Models.models import db
 
 if __name__ == "__main__":
+    # Local development: make sure the tables exist before serving
+    with app.app_context():
+        db.create_all()
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+Logins per second for password hash settings, through the same capped
+hasher the auth endpoints use. Run from Backend/functions:
+
+    python bench_hashing.py
+    python bench_hashing.py --seconds 5 --clients 16 --concurrency 1 scrypt:16384:8:1 pbkdf2:sha256:600000
+
+Pick the strongest setting whose logins/sec still covers peak login traffic,
+then set it as "password_hashing": {"method": ...} in config.json; existing
+hashes are upgraded as users log in.
+"""
+import argparse
+import threading
+import time
+
+from werkzeug.security import generate_password_hash
+
+from RecipePackage.Auth.hashing import HashingBusy, PasswordHasher
+
+DEFAULT_METHODS = [
+    'scrypt:32768:8:1',
+    'scrypt:16384:8:1',
+    'pbkdf2:sha256:1000000',
+    'pbkdf2:sha256:600000',
+    'pbkdf2:sha256:260000',
+]
+
+
+def bench(method, seconds, clients, concurrency, queue_timeout):
+    hasher = PasswordHasher(method=method, max_concurrency=concurrency, queue_timeout=queue_timeout)
+    pwhash = generate_password_hash('correct horse battery staple', method)
+    latencies = []
+    busy = [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + seconds
+
+    def client():
+        while time.monotonic() < stop_at:
+            started = time.monotonic()
+            try:
+                hasher.check(pwhash, 'correct horse battery staple')
+            except HashingBusy:
+                with lock:
+                    busy[0] += 1
+                continue
+            with lock:
+                latencies.append(time.monotonic() - started)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0
+    return len(latencies) / elapsed, 1000 * p95, busy[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('methods', nargs='*', default=DEFAULT_METHODS)
+    parser.add_argument('--seconds', type=float, default=3)
+    parser.add_argument('--clients', type=int, default=8, help='concurrent login requests')
+    parser.add_argument('--concurrency', type=int, default=1, help='hasher max_concurrency')
+    parser.add_argument('--queue-timeout', type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients, max_concurrency={args.concurrency}, {args.seconds:g}s per method")
+    print(f"{'method':<26}{'logins/s':>10}{'p95 ms':>10}{'503s':>8}")
+    for method in args.methods:
+        rate, p95, busy = bench(method, args.seconds, args.clients, args.concurrency, args.queue_timeout)
+        print(f"{method:<26}{rate:>10.1f}{p95:>10.1f}{busy:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""avatar columns, ai_response_cache, aisavedrecipe.user_id index
+
+Revision ID: 4b7d05e8c2a1
+Revises: 9c1f3e2a7b10
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b7d05e8c2a1'
+down_revision = '9c1f3e2a7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ai_response_cache',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('response', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    with op.batch_alter_table('ai_response_cache', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_ai_response_cache_created_at'), ['created_at'], unique=False)
+
+    # /ai-recipe-saved lists a user's recipes
+    with op.batch_alter_table('aisavedrecipe', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_aisavedrecipe_user_id'), ['user_id'], unique=False)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('thumbnail', sa.LargeBinary(length=2**24 - 1), nullable=True))  # MEDIUMBLOB
+        batch_op.add_column(sa.Column('image_type', sa.String(length=32), nullable=True))
+        batch_op.add_column(sa.Column('image_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('image_hash')
+        batch_op.drop_column('image_type')
+        batch_op.drop_column('thumbnail')
+
+    with op.batch_alter_table('aisavedrecipe', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_aisavedrecipe_user_id'))
+
+    with op.batch_alter_table('ai_response_cache', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_ai_response_cache_created_at'))
+
+    op.drop_table('ai_response_cache')
@@ -0,0 +1,35 @@
+"""otp_codes table
+
+Revision ID: 7a3e91b0d4c8
+Revises: e2a9c4d61f37
+Create Date: 2026-10-18 13:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a3e91b0d4c8'
+down_revision = 'e2a9c4d61f37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('otp_codes',
+    sa.Column('key', sa.String(length=190), nullable=False),
+    sa.Column('code_hash', sa.String(length=64), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    with op.batch_alter_table('otp_codes', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_otp_codes_expires_at'), ['expires_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('otp_codes', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_otp_codes_expires_at'))
+
+    op.drop_table('otp_codes')
@@ -0,0 +1,59 @@
+"""baseline: users, uploaded_recipe, aisavedrecipe
+
+Revision ID: 9c1f3e2a7b10
+Revises: 
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = '9c1f3e2a7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=120), nullable=False),
+    sa.Column('password', sa.String(length=255), nullable=False),
+    sa.Column('phone', sa.String(length=15), nullable=True),
+    sa.Column('age', sa.Integer(), nullable=True),
+    sa.Column('bio', sa.String(length=500), nullable=True),
+    sa.Column('image', mysql.LONGBLOB(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email'),
+    sa.UniqueConstraint('phone')
+    )
+    op.create_table('uploaded_recipe',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('ingredients', sa.Text(), nullable=False),
+    sa.Column('instructions', sa.Text(), nullable=False),
+    sa.Column('image_url', sa.String(length=500), nullable=True),
+    sa.Column('cuisine', sa.String(length=100), nullable=True),
+    sa.Column('course', sa.String(length=100), nullable=True),
+    sa.Column('diet', sa.String(length=100), nullable=True),
+    sa.Column('prep_time', sa.String(length=50), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('aisavedrecipe',
+    sa.Column('recipe_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('recipe_name', sa.String(length=255), nullable=False),
+    sa.Column('recipe', sa.JSON(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('recipe_id')
+    )
+
+
+def downgrade():
+    op.drop_table('aisavedrecipe')
+    op.drop_table('uploaded_recipe')
+    op.drop_table('users')
@@ -0,0 +1,31 @@
+"""uploaded_recipe cuisine/course/diet indexes
+
+Revision ID: e2a9c4d61f37
+Revises: 4b7d05e8c2a1
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a9c4d61f37'
+down_revision = '4b7d05e8c2a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filters of the paginated /recipes/api/recipes listing
+    with op.batch_alter_table('uploaded_recipe', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_uploaded_recipe_course'), ['course'], unique=False)
+        batch_op.create_index(batch_op.f('ix_uploaded_recipe_cuisine'), ['cuisine'], unique=False)
+        batch_op.create_index(batch_op.f('ix_uploaded_recipe_diet'), ['diet'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('uploaded_recipe', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_uploaded_recipe_diet'))
+        batch_op.drop_index(batch_op.f('ix_uploaded_recipe_cuisine'))
+        batch_op.drop_index(batch_op.f('ix_uploaded_recipe_course'))
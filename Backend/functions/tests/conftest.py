@@ -0,0 +1,140 @@
+"""
+Shared fixtures. Run from Backend/functions with `python -m pytest tests`;
+the modules under test read config.json like the app does, so it has to exist.
+"""
+import datetime
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask import Flask
+from flask_jwt_extended import JWTManager
+from sqlalchemy import event
+from sqlalchemy.dialects.mysql import LONGBLOB
+from sqlalchemy.ext.compiler import compiles
+
+from RecipePackage.Models.models import db
+
+
+@compiles(LONGBLOB, 'sqlite')
+def _longblob_on_sqlite(type_, compiler, **kw):
+    return 'BLOB'
+
+
+@pytest.fixture
+def app():
+    """A bare app on an in-memory SQLite database; tests register the blueprints they need."""
+    app = Flask(__name__)
+    app.config.update(
+        TESTING=True,
+        SQLALCHEMY_DATABASE_URI='sqlite://',
+        JWT_SECRET_KEY='test-secret-key-that-is-long-enough',
+        JWT_ACCESS_TOKEN_EXPIRES=datetime.timedelta(hours=1),
+    )
+    db.init_app(app)
+    JWTManager(app)
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+
+class QueryLog:
+    """SQL statements run on an engine, with the time each one took."""
+
+    def __init__(self):
+        self.statements = []
+        self.durations = []
+
+    def clear(self):
+        self.statements.clear()
+        self.durations.clear()
+
+    def __len__(self):
+        return len(self.statements)
+
+    @property
+    def elapsed(self):
+        return sum(self.durations)
+
+    def selected_columns(self):
+        """The column list of every SELECT, lower-cased."""
+        return [
+            statement.split(' FROM ', 1)[0].lower()
+            for statement in (' '.join(s.split()) for s in self.statements)
+            if statement.upper().startswith('SELECT')
+        ]
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.durations.append(time.perf_counter() - context._query_started)
+
+
+@pytest.fixture
+def queries(app):
+    """Logs every statement the app's engine executes during the test."""
+    log = QueryLog()
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', log._before)
+    event.listen(engine, 'after_cursor_execute', log._after)
+    yield log
+    event.remove(engine, 'before_cursor_execute', log._before)
+    event.remove(engine, 'after_cursor_execute', log._after)
+
+
+RECIPE_JSON = '```json\n{"name": "Fake Dish", "prep_time": 10, "ingredients": ["a", "b"], "steps": ["x", "y"]}\n```'
+
+
+class FakeGemini:
+    """
+    Stands in for genai.GenerativeModel: returns `text` (or raises the
+    errors queued in `failures`) after `delay` seconds and counts the calls.
+    """
+
+    def __init__(self, text=RECIPE_JSON, delay=0.0):
+        self.text = text
+        self.delay = delay
+        self.failures = []
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        with self._lock:
+            self.calls += 1
+            failure = self.failures.pop(0) if self.failures else None
+        time.sleep(self.delay)
+        if failure is not None:
+            raise failure
+        if stream:
+            return [SimpleNamespace(text=self.text[i:i + 8]) for i in range(0, len(self.text), 8)]
+        return SimpleNamespace(text=self.text)
+
+
+@pytest.fixture
+def gemini(app, monkeypatch):
+    """
+    The airecipe blueprint on `app`, wired to a FakeGemini with a fresh
+    gateway and response cache (memory + SQL tier). Returns the fake.
+    """
+    from RecipePackage.Airecipe import airecipe
+    from RecipePackage.Airecipe.gateway import from_config as gateway_from_config
+    from RecipePackage.Airecipe.response_cache import ResponseCache, SqlResponseStore
+
+    model = FakeGemini()
+    monkeypatch.setattr(airecipe, '_model', model)
+    monkeypatch.setattr(airecipe, 'gateway', gateway_from_config({}))
+    monkeypatch.setattr(airecipe, 'response_cache', ResponseCache(store=SqlResponseStore()))
+    monkeypatch.setattr(airecipe, 'RETRIEVAL_ENABLED', False)
+    app.register_blueprint(airecipe.airecipe, url_prefix='/airecipe')
+    return model
@@ -0,0 +1,40 @@
+from RecipePackage.Airecipe import airecipe
+
+
+def question(ingredient, meal='Dinner'):
+    return {
+        'mealType': meal,
+        'mainIngredient': ingredient,
+        'spiceLevel': 'Medium',
+        'cuisine': 'Indian',
+        'timeAvailable': '30 minutes',
+    }
+
+
+def test_batch_dedupes_keeps_order_and_isolates_failures(app, gemini, monkeypatch):
+    put = airecipe.response_cache.put
+
+    def failing_put(kind, prompt, value):
+        if 'tofu' in prompt:
+            raise RuntimeError('cache database went away')
+        put(kind, prompt, value)
+
+    monkeypatch.setattr(airecipe.response_cache, 'put', failing_put)
+
+    response = app.test_client().post('/airecipe/ai-recipe-qusn/batch', json={'questions': [
+        question('paneer'),
+        question('dal', meal='Lunch'),
+        question('paneer'),        # same as the first one
+        {'mealType': 'Dinner'},    # no main ingredient
+        question('tofu'),          # fails after Gemini answered
+    ]})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body['status'], body['count'], body['unique']) == (False, 5, 3)
+    assert [item['index'] for item in body['results']] == [0, 1, 2, 3, 4]
+    assert [item['status'] for item in body['results']] == [True, True, True, False, False]
+    assert body['results'][0]['answer'] == body['results'][2]['answer']
+    assert body['results'][3]['error'] == 'Invalid question'
+    assert body['results'][4]['error'] == 'Could not generate this recipe'
+    assert gemini.calls == 3
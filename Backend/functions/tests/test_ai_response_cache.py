@@ -0,0 +1,43 @@
+from RecipePackage.Airecipe import airecipe
+
+QUESTION = {
+    'mealType': 'Dinner',
+    'mainIngredient': 'paneer',
+    'spiceLevel': 'Medium',
+    'cuisine': 'Indian',
+    'timeAvailable': '30 minutes',
+}
+
+
+def test_repeated_question_is_answered_from_the_cache(app, gemini):
+    client = app.test_client()
+
+    first = client.post('/airecipe/ai-recipe-qusn', json=QUESTION)
+    # Same prompt up to case and whitespace
+    second = client.post('/airecipe/ai-recipe-qusn', json={**QUESTION, 'mainIngredient': '  PANEER '})
+
+    assert first.status_code == second.status_code == 200
+    assert first.get_json()['answer']['name'] == 'Fake Dish'
+    assert second.get_json() == first.get_json()
+    assert gemini.calls == 1
+
+
+def test_persistent_tier_survives_a_cold_memory_tier(app, gemini):
+    client = app.test_client()
+    client.post('/airecipe/ai-recipe-qusn', json=QUESTION)
+
+    airecipe.response_cache.memory.clear()
+    response = client.post('/airecipe/ai-recipe-qusn', json=QUESTION)
+
+    assert response.get_json()['answer']['name'] == 'Fake Dish'
+    assert gemini.calls == 1
+    assert airecipe.response_cache.stats()['persistent']['hits'] == 1
+
+
+def test_unparseable_answers_are_not_cached(app, gemini):
+    client = app.test_client()
+    gemini.text = 'Sorry, I cannot help with that.'
+
+    assert client.post('/airecipe/ai-recipe-qusn', json=QUESTION).status_code == 400
+    assert client.post('/airecipe/ai-recipe-qusn', json=QUESTION).status_code == 400
+    assert gemini.calls == 2
@@ -0,0 +1,59 @@
+import csv
+
+import pytest
+
+from RecipePackage.Airecipe import airecipe
+from RecipePackage.Recipes import recipes as recipes_module
+
+NAMES = ['Masala Karela Recipe', 'Rice with Dal', 'Paneer Butter Masala', 'Aloo Gobi Recipe', 'Dal Makhani']
+
+
+@pytest.fixture
+def client(app, gemini, monkeypatch, tmp_path):
+    path = tmp_path / 'cuisines.csv'
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['name', 'image_url', 'description', 'cuisine', 'course', 'diet',
+                         'prep_time', 'ingredients', 'instructions'])
+        for i, name in enumerate(NAMES):
+            writer.writerow([name, f'http://img/{i}.jpg', 'desc', 'Indian', 'Lunch',
+                             'Vegetarian', '30 M', 'onion, tomato', 'Cook'])
+    recipes_module.reload_dataset(str(path))
+    monkeypatch.setattr(airecipe, 'RETRIEVAL_ENABLED', True)
+    return app.test_client()
+
+
+def ask(client, prompt):
+    response = client.post('/airecipe/ask', json={'prompt': prompt})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+@pytest.mark.parametrize('prompt', ['Masala Karela Recipe', 'Rice with Dal', '  rice   WITH dal '])
+def test_exact_dataset_names_are_answered_locally(client, gemini, prompt):
+    body = ask(client, prompt)
+
+    assert body['source'] == 'dataset'
+    assert body['recipe'].lower() == ' '.join(prompt.lower().split())
+    assert body['confidence'] == 1.0
+    assert gemini.calls == 0
+
+
+@pytest.mark.parametrize('prompt, name', [
+    ('how to make masala karela', 'Masala Karela Recipe'),
+    ('recipe for rice with dal', 'Rice with Dal'),
+    ('aloo gobhi', 'Aloo Gobi Recipe'),
+])
+def test_paraphrased_names_match_without_their_filler_words(client, gemini, prompt, name):
+    body = ask(client, prompt)
+
+    assert body['source'] == 'dataset'
+    assert body['recipe'] == name
+    assert gemini.calls == 0
+
+
+def test_unknown_dishes_go_to_gemini(client, gemini):
+    body = ask(client, 'chocolate lava cake')
+
+    assert body['source'] == 'gemini'
+    assert gemini.calls == 1
@@ -0,0 +1,84 @@
+import json
+
+from RecipePackage.Airecipe.json_stream import JsonFieldStream
+
+QUESTION = {
+    'mealType': 'Lunch',
+    'mainIngredient': 'rice',
+    'spiceLevel': 'Mild',
+    'cuisine': 'Indian',
+    'timeAvailable': '20 minutes',
+}
+
+
+def events(response):
+    """(event, data) pairs of a Server-Sent Events body."""
+    parsed = []
+    for block in response.get_data(as_text=True).split('\n\n'):
+        if not block.strip():
+            continue
+        fields = dict(line.split(': ', 1) for line in block.splitlines())
+        parsed.append((fields['event'], json.loads(fields['data'])))
+    return parsed
+
+
+def test_fields_are_emitted_as_soon_as_they_are_complete():
+    text = '```json\n{"name": "Dal", "prep_time": 15, "ingredients": ["dal", "salt"], "steps": ["boil"]}\n```'
+    parser = JsonFieldStream()
+
+    emitted = []
+    for i, char in enumerate(text):
+        emitted += [(i, key, value) for key, value in parser.feed(char)]
+
+    assert [(key, value) for _, key, value in emitted] == [
+        ('name', 'Dal'), ('prep_time', 15), ('ingredients', ['dal', 'salt']), ('steps', ['boil']),
+    ]
+    # A number is only complete once the next character shows it has ended
+    assert text[emitted[1][0]] == ','
+    assert parser.done
+
+
+def test_recipe_stream_sends_fields_in_order_then_done(app, gemini):
+    response = app.test_client().post('/airecipe/ai-recipe-qusn?stream=1', json=QUESTION)
+
+    assert response.mimetype == 'text/event-stream'
+    received = events(response)
+    assert [name for name, _ in received] == ['field'] * 4 + ['done']
+    assert [data['key'] for _, data in received[:4]] == ['name', 'prep_time', 'ingredients', 'steps']
+    assert received[-1][1] == {
+        'status': True,
+        'answer': {'name': 'Fake Dish', 'prep_time': 10, 'ingredients': ['a', 'b'], 'steps': ['x', 'y']},
+    }
+
+    # The streamed recipe was cached: the next request replays it without Gemini
+    again = events(app.test_client().post('/airecipe/ai-recipe-qusn?stream=1', json=QUESTION))
+    assert again == received
+    assert gemini.calls == 1
+
+
+def test_recipe_stream_reports_invalid_json(app, gemini):
+    gemini.text = 'I would rather not share a recipe today.'
+
+    received = events(app.test_client().post('/airecipe/ai-recipe-qusn?stream=1', json=QUESTION))
+
+    assert received == [('error', {'status': False, 'error': 'AI response not valid JSON'})]
+
+
+def test_recipe_stream_reports_upstream_failure(app, gemini):
+    gemini.failures = [ValueError('bad request')]
+
+    received = events(app.test_client().post('/airecipe/ai-recipe-qusn?stream=1', json=QUESTION))
+
+    assert received == [('error', {'status': False, 'error': 'AI service unavailable'})]
+
+
+def test_answer_stream_sends_chunks_then_the_whole_answer(app, gemini):
+    gemini.text = 'Recipe Name: Lemon Rice\nIngredients:\n- rice\n- lemon'
+
+    received = events(app.test_client().post(
+        '/airecipe/ask', json={'prompt': 'lemon rice'}, headers={'Accept': 'text/event-stream'}))
+
+    assert [name for name, _ in received[:-1]] == ['chunk'] * (len(received) - 1)
+    assert len(received) > 2
+    assert ''.join(data['text'] for _, data in received[:-1]) == gemini.text
+    assert received[-1] == ('done', {'answer': gemini.text, 'source': 'gemini'})
@@ -0,0 +1,54 @@
+import pytest
+
+from RecipePackage.Auth import auth
+from RecipePackage.Auth.profile_cache import from_config as profile_cache_from_config
+from RecipePackage.Models.models import User, db
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\0' * 4096
+
+
+@pytest.fixture
+def client(app, monkeypatch):
+    monkeypatch.setattr(auth, 'profile_cache', profile_cache_from_config({}))
+    app.register_blueprint(auth.authp, url_prefix='/auth')
+    return app.test_client()
+
+
+def add_user(app, image_hash='f' * 64):
+    with app.app_context():
+        user = User(name='Cook', email=f'cook{image_hash}@example.com', password='x',
+                    image=PNG, image_type='image/png', image_hash=image_hash)
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+def test_avatar_is_served_with_the_version_from_its_url(app, client):
+    user_id = add_user(app)
+
+    response = client.get(f'/auth/avatar/{user_id}?v=' + 'f' * 16)
+
+    assert response.status_code == 200
+    assert response.data == PNG
+    assert response.mimetype == 'image/png'
+
+
+@pytest.mark.parametrize('query', ['', '?size=thumb', '?v=', '?v=' + 'e' * 16, '?v=' + 'f' * 64, '?v=ƒ'])
+def test_avatar_without_the_right_version_is_not_found(app, client, query):
+    user_id = add_user(app)
+
+    response = client.get(f'/auth/avatar/{user_id}{query}')
+
+    assert response.status_code == 404
+    assert response.data != PNG
+
+
+def test_pictures_without_a_stored_hash_get_one_on_first_profile_view(app, client):
+    user_id = add_user(app, image_hash=None)
+    with app.test_request_context():
+        user = db.session.get(User, user_id)
+        url = auth.avatar_fields(user)['image']
+        version = user.image_hash[:16]
+
+    assert url.endswith(f'v={version}')
+    assert client.get(f'/auth/avatar/{user_id}?v={version}').data == PNG
@@ -0,0 +1,193 @@
+import threading
+import time
+
+import pytest
+
+from RecipePackage.Airecipe.gateway import (
+    CircuitBreaker, CircuitOpen, GeminiGateway, Overloaded, UpstreamError, UpstreamTimeout,
+)
+
+
+class FakeClock:
+    """Manual clock; `sleep` advances it instead of blocking."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class Flaky:
+    """fn() that raises the given errors in turn, then returns 'ok'."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return 'ok'
+
+
+def make_gateway(clock=None, delay=1.0, **kwargs):
+    """Gateway on `clock` (a FakeClock), or on real time when waiting on threads."""
+    sleep = clock.sleep if clock is not None else time.sleep
+    clock = clock or time.monotonic
+    options = {'max_workers': 2, 'max_queue': 2, 'timeout': 30, 'retries': 2}
+    options.update(kwargs)
+    gateway = GeminiGateway(
+        breaker=CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock),
+        clock=clock, sleep=sleep, **options,
+    )
+    gateway._delay = lambda attempt: delay  # no jitter in tests
+    return gateway
+
+
+# --- retries --------------------------------------------------------------
+
+def test_retryable_errors_are_retried_with_backoff():
+    clock = FakeClock()
+    gateway = make_gateway(clock)
+    fn = Flaky(ConnectionError('reset'), TimeoutError('slow'))
+
+    assert gateway.call('k', fn) == 'ok'
+    assert fn.calls == 3
+    assert clock.sleeps == [1.0, 1.0]
+    assert gateway.stats()['retries'] == 2
+    assert gateway.stats()['calls'] == 1
+    assert gateway.breaker.state == 'closed'
+
+
+def test_other_errors_are_not_retried():
+    gateway = make_gateway(FakeClock())
+    fn = Flaky(ValueError('bad prompt'))
+
+    with pytest.raises(UpstreamError):
+        gateway.call('k', fn)
+    assert fn.calls == 1
+
+
+def test_retries_stop_at_the_deadline():
+    clock = FakeClock()
+    gateway = make_gateway(clock, delay=6.0, retries=5, timeout=10)
+    fn = Flaky(*[ConnectionError('reset')] * 6)
+
+    with pytest.raises(UpstreamError):
+        gateway.call('k', fn)
+    # Fails at t=0 and t=6; another 6s backoff would end past the 10s deadline
+    assert fn.calls == 2
+    assert clock.now - 1000.0 < 10
+
+
+# --- circuit breaker ------------------------------------------------------
+
+def test_breaker_counts_each_failed_attempt_and_fails_fast_while_open():
+    clock = FakeClock()
+    gateway = make_gateway(clock)
+    fn = Flaky(*[ConnectionError('down')] * 3)
+
+    with pytest.raises(UpstreamError):
+        gateway.call('k', fn)
+    assert gateway.breaker.state == 'open'
+
+    upstream = Flaky()
+    with pytest.raises(CircuitOpen):
+        gateway.call('k', upstream)
+    assert upstream.calls == 0
+    assert gateway.stats()['short_circuited'] == 1
+
+    # After reset_timeout one probe goes through and closes the circuit
+    clock.now += 10
+    assert gateway.call('k', upstream) == 'ok'
+    assert gateway.breaker.state == 'closed'
+
+
+def test_slow_call_shared_by_many_waiters_counts_once():
+    gateway = make_gateway()
+    release = threading.Event()
+
+    def slow():
+        release.wait(5)
+        return 'late'
+
+    errors = []
+
+    def wait():
+        try:
+            gateway.call('same prompt', slow, timeout=0.05)
+        except UpstreamTimeout as e:
+            errors.append(e)
+
+    waiters = [threading.Thread(target=wait) for _ in range(5)]
+    for thread in waiters:
+        thread.start()
+    for thread in waiters:
+        thread.join()
+
+    assert len(errors) == 5
+    assert gateway.stats()['timeouts'] == 5
+    assert gateway.breaker.failures == 0
+    assert gateway.breaker.state == 'closed'
+
+    release.set()
+    gateway._executor.shutdown(wait=True)
+    assert gateway.breaker.state == 'closed'
+
+
+# --- overload -------------------------------------------------------------
+
+def test_calls_beyond_workers_and_queue_are_rejected():
+    gateway = make_gateway(max_workers=1, max_queue=1)
+    release = threading.Event()
+    blocked = lambda: release.wait(5)
+
+    with pytest.raises(UpstreamTimeout):
+        gateway.call('running', blocked, timeout=0.05)
+    with pytest.raises(UpstreamTimeout):
+        gateway.call('queued', blocked, timeout=0.05)
+    with pytest.raises(Overloaded):
+        gateway.call('rejected', blocked, timeout=0.05)
+
+    stats = gateway.stats()
+    assert (stats['running'], stats['queue_depth'], stats['rejected']) == (1, 1, 1)
+    assert gateway.breaker.state == 'closed'
+    release.set()
+    gateway._executor.shutdown(wait=True)
+
+
+# --- streams --------------------------------------------------------------
+
+def test_streams_share_the_worker_slots():
+    gateway = make_gateway(max_workers=2, max_queue=5, timeout=0.1)
+
+    open_streams = [gateway.stream(lambda: iter(['a', 'b'])) for _ in range(2)]
+    assert [next(stream) for stream in open_streams] == ['a', 'a']
+    assert gateway.stats()['running'] == 2
+
+    with pytest.raises(UpstreamTimeout):
+        next(gateway.stream(lambda: iter(['c'])))
+    assert gateway.stats()['running'] == 2
+
+    for stream in open_streams:
+        stream.close()
+    assert list(gateway.stream(lambda: iter(['c']))) == ['c']
+    assert gateway.stats()['running'] == 0
+
+
+def test_stream_open_retries_stop_at_the_deadline():
+    clock = FakeClock()
+    gateway = make_gateway(clock, delay=6.0, retries=5, timeout=10)
+    opener = Flaky(*[ConnectionError('reset')] * 6)
+
+    with pytest.raises(UpstreamError):
+        list(gateway.stream(lambda: iter([opener()])))
+    assert opener.calls == 2
+    assert gateway.stats()['running'] == 0
@@ -0,0 +1,51 @@
+import csv
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from RecipePackage.Recipes import recipes as recipes_module
+
+INGREDIENTS = ['onion', 'tomato', 'garlic', 'paneer', 'rice', 'ginger', 'butter', 'curd']
+
+QUERIES = [
+    (['onion'], 1),
+    (['onion', 'tomato'], 1),
+    (['onion', 'tomato'], 2),
+    (['garlic', 'paneer', 'rice'], 1),
+    (['ginger'], 3),
+    (['butter', 'curd', 'onion', 'rice'], 1),
+]
+
+
+@pytest.fixture
+def client(app, tmp_path):
+    path = tmp_path / 'cuisines.csv'
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['name', 'image_url', 'description', 'cuisine', 'course', 'diet',
+                         'prep_time', 'ingredients', 'instructions'])
+        for i in range(300):
+            ingredients = ', '.join(INGREDIENTS[j] for j in range(len(INGREDIENTS)) if (i >> j) % 3 == 0)
+            writer.writerow([f'Recipe {i}', f'http://img/{i}.jpg', 'desc', 'Indian', 'Lunch',
+                             'Vegetarian', f'{i % 60} M', ingredients, 'Cook'])
+    recipes_module.reload_dataset(str(path))
+    app.register_blueprint(recipes_module.recipe, url_prefix='/recipes')
+    return app.test_client()
+
+
+def search(client, ingredients, page):
+    response = client.post(f'/recipes/search-by-ingredients?limit=10&page={page}',
+                           json={'ingredients': ingredients})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_parallel_searches_match_serial_results(client):
+    expected = [search(client, ingredients, page) for ingredients, page in QUERIES]
+    assert all(result['recipes'] for result in expected)
+
+    burst = QUERIES * 20
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda query: search(client, *query), burst))
+
+    assert results == expected * 20
@@ -0,0 +1,121 @@
+import socket
+
+import pytest
+from aiosmtpd.controller import Controller
+from flask import Flask
+from flask_mail import Mail, Message
+
+from RecipePackage.Mail import mailsender
+from RecipePackage.Mail.mailqueue import MailQueue
+
+
+class Inbox:
+    """aiosmtpd handler that keeps the recipients of every accepted mail."""
+
+    def __init__(self):
+        self.recipients = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.recipients.extend(envelope.rcpt_tos)
+        return '250 OK'
+
+
+class SmtpServer:
+    """A local aiosmtpd server on a free port that can be stopped and started again."""
+
+    def __init__(self):
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            self.port = s.getsockname()[1]
+        self.inbox = Inbox()
+        self._controller = None
+
+    def start(self):
+        self._controller = Controller(self.inbox, hostname='127.0.0.1', port=self.port)
+        self._controller.start()
+
+    def stop(self):
+        if self._controller is not None:
+            self._controller.stop()
+            self._controller = None
+
+
+@pytest.fixture
+def smtp():
+    server = SmtpServer()
+    server.start()
+    yield server, server.inbox
+    server.stop()
+
+
+def mail_app(port):
+    app = Flask(__name__)
+    app.config.update(MAIL_SERVER='127.0.0.1', MAIL_PORT=port, MAIL_USE_TLS=False,
+                      MAIL_USERNAME=None, MAIL_PASSWORD=None, MAIL_DEFAULT_SENDER='app@example.com')
+    mail = Mail(app)
+    return app, mail
+
+
+def message(recipient):
+    return Message(subject='Your code', recipients=[recipient], body='123456', sender='app@example.com')
+
+
+def test_queued_mails_go_out_in_one_batch_over_one_connection(smtp):
+    server, inbox = smtp
+    app, mail = mail_app(server.port)
+    queue = MailQueue(mail, batch_window=0.2)
+    queue.init_app(app)
+
+    for i in range(5):
+        queue.enqueue(message(f'user{i}@example.com'))
+
+    assert queue.flush(timeout=10)
+    assert inbox.recipients == [f'user{i}@example.com' for i in range(5)]
+    stats = queue.stats()
+    assert (stats['sent'], stats['failed'], stats['batches'], stats['reconnects']) == (5, 0, 1, 0)
+
+
+def test_dropped_connection_is_reopened_and_the_mail_retried(smtp):
+    server, inbox = smtp
+    app, mail = mail_app(server.port)
+    queue = MailQueue(mail, batch_window=0)
+    queue.init_app(app)
+    queue.enqueue(message('first@example.com'))
+    assert queue.flush(timeout=10)
+
+    # Server restarts while the worker still holds the old connection
+    server.stop()
+    server.start()
+    queue.enqueue(message('second@example.com'))
+
+    assert queue.flush(timeout=10)
+    assert inbox.recipients == ['first@example.com', 'second@example.com']
+    assert queue.stats()['reconnects'] == 1
+
+
+def test_unreachable_server_fails_after_the_retries(smtp):
+    server, inbox = smtp
+    app, mail = mail_app(server.port)
+    server.stop()
+    queue = MailQueue(mail, batch_window=0, retries=1)
+    queue.init_app(app)
+
+    queue.enqueue(message('lost@example.com'))
+
+    assert queue.flush(timeout=10)
+    assert queue.stats()['failed'] == 1
+    assert queue.stats()['reconnects'] == 2
+
+
+def test_send_email_without_the_queue_delivers_before_returning(smtp, monkeypatch):
+    server, inbox = smtp
+    app, mail = mail_app(server.port)
+    monkeypatch.setattr(mailsender, 'mail', mail)
+    monkeypatch.setattr(mailsender, 'QUEUE_ENABLED', False)
+
+    with app.app_context():
+        app.config['MAIL_USERNAME'] = 'app@example.com'
+        mailsender.send_email('Your code', 'now@example.com', '123456')
+
+    # No worker involved: on a throttled serverless instance nothing is left to send later
+    assert inbox.recipients == ['now@example.com']
@@ -0,0 +1,36 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+from RecipePackage.Models.pool import engine_options, gauges, warm_up
+
+
+def make_engine(path, **pool_conf):
+    options = engine_options({'pool_size': 2, 'max_overflow': 1, 'pool_timeout': 0.1, **pool_conf})
+    options.pop('connect_args')  # PyMySQL only
+    return create_engine(f'sqlite:///{path}', **options)
+
+
+def test_warm_up_opens_at_most_pool_size_connections(tmp_path):
+    engine = make_engine(tmp_path / 'db.sqlite')
+
+    assert warm_up(engine, 5) == 2
+    assert gauges(engine)['idle'] == 2
+
+
+def test_each_engine_has_its_own_counters(tmp_path):
+    busy = make_engine(tmp_path / 'busy.sqlite')
+    quiet = make_engine(tmp_path / 'quiet.sqlite')
+
+    held = [busy.connect() for _ in range(3)]
+    with pytest.raises(exc.TimeoutError):
+        busy.connect()
+
+    stats = gauges(busy)
+    assert (stats['in_use'], stats['overflow'], stats['checkouts'], stats['checkout_timeouts']) == (3, 1, 3, 1)
+    assert (gauges(quiet)['checkouts'], gauges(quiet)['checkout_timeouts']) == (0, 0)
+
+    for connection in held:
+        connection.close()
+    # dispose() recreates the pool; the counters carry over
+    busy.dispose()
+    assert gauges(busy)['checkouts'] == 3
@@ -0,0 +1,124 @@
+"""
+Query-count and latency guards for the list endpoints: the number of
+statements must not grow with the number of rows, and list views must not
+pull the large columns (recipe JSON, uploaded recipe text, avatar blobs).
+"""
+import re
+import time
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from RecipePackage.Airecipe import airecipe
+from RecipePackage.Auth import auth
+from RecipePackage.Auth.profile_cache import from_config as profile_cache_from_config
+from RecipePackage.Models.models import Aisavedrecipe, UploadedRecipe, User, db
+from RecipePackage.Recipes import recipes
+
+# Generous: SQLite in memory answers these in a few milliseconds
+LATENCY_BUDGET = 0.5
+
+
+@pytest.fixture
+def client(app, monkeypatch):
+    monkeypatch.setattr(auth, 'profile_cache', profile_cache_from_config({}))
+    app.register_blueprint(auth.authp, url_prefix='/auth')
+    app.register_blueprint(recipes.recipe, url_prefix='/recipes')
+    app.register_blueprint(airecipe.airecipe, url_prefix='/airecipe')
+    return app.test_client()
+
+
+def add_user(app, saved=0, with_image=False):
+    """A user with `saved` AI recipes; returns their auth header."""
+    with app.app_context():
+        user = User(name='Cook', email=f'cook{time.perf_counter_ns()}@example.com', password='x')
+        if with_image:
+            user.image = b'\x89PNG\r\n\x1a\n' + b'\0' * 4096
+            user.thumbnail = b'\x89PNG\r\n\x1a\n' + b'\0' * 512
+            user.image_type = 'image/png'
+            user.image_hash = 'f' * 64
+        db.session.add(user)
+        db.session.flush()
+        for i in range(saved):
+            recipe = {'name': f'Dish {i}', 'ingredients': ['a'] * 50, 'steps': ['b'] * 50}
+            db.session.add(Aisavedrecipe(user_id=user.id, recipe_name=recipe['name'], recipe=recipe))
+        db.session.commit()
+        return {'Authorization': 'Bearer ' + create_access_token(identity=str(user.id))}
+
+
+def add_uploaded_recipes(app, count):
+    with app.app_context():
+        for i in range(count):
+            db.session.add(UploadedRecipe(
+                title=f'Recipe {i}', ingredients='flour, water ' * 100, instructions='Mix. ' * 200,
+                cuisine='Indian' if i % 2 else 'Italian', course='Dinner', diet='Vegetarian', prep_time='20 M',
+            ))
+        db.session.commit()
+
+
+def timed_get(client, queries, url, **kwargs):
+    queries.clear()
+    started = time.perf_counter()
+    response = client.get(url, **kwargs)
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 200, response.get_data(as_text=True)
+    assert elapsed < LATENCY_BUDGET, f'{url} took {elapsed * 1000:.1f} ms ({len(queries)} queries)'
+    return response
+
+
+@pytest.mark.parametrize('saved', [3, 120])
+def test_saved_recipes_list_is_one_query_without_the_recipe_json(app, client, queries, saved):
+    headers = add_user(app, saved=saved)
+
+    response = timed_get(client, queries, '/airecipe/ai-recipe-saved', headers=headers)
+
+    assert len(response.get_json()['recipes']) == saved
+    assert len(queries) == 1
+    assert not any(re.search(r'aisavedrecipe\.recipe\b', columns) for columns in queries.selected_columns())
+
+
+@pytest.mark.parametrize('count', [5, 150])
+def test_uploaded_recipes_page_is_one_query_without_the_text_columns(app, client, queries, count):
+    add_uploaded_recipes(app, count)
+
+    response = timed_get(client, queries, '/recipes/api/recipes?limit=100')
+
+    assert len(response.get_json()['recipes']) == min(count, 100)
+    assert len(queries) == 1
+    for columns in queries.selected_columns():
+        assert 'ingredients' not in columns and 'instructions' not in columns
+
+
+def test_every_uploaded_recipes_page_costs_the_same(app, client, queries):
+    add_uploaded_recipes(app, 95)
+
+    cursor, pages = None, 0
+    while True:
+        url = '/recipes/api/recipes?limit=20&cuisine=Indian' + (f'&cursor={cursor}' if cursor else '')
+        body = timed_get(client, queries, url).get_json()
+        assert len(queries) == 1
+        pages += 1
+        cursor = body['next_cursor']
+        if cursor is None:
+            break
+    assert pages == 3  # 47 Indian recipes
+
+
+def test_profile_does_not_load_the_avatar_blobs(app, client, queries):
+    headers = add_user(app, with_image=True)
+
+    response = timed_get(client, queries, '/auth/whoami', headers=headers)
+
+    assert response.get_json()['user']['thumbnail'].endswith('size=thumb')
+    assert len(queries) == 1
+    for columns in queries.selected_columns():
+        assert not re.search(r'users\.(image|thumbnail)\b', columns)
+
+
+def test_hot_lookups_use_their_indexes(app):
+    with app.app_context():
+        def plan(sql):
+            return ' '.join(row[-1] for row in db.session.execute(db.text('EXPLAIN QUERY PLAN ' + sql)))
+
+        assert 'ix_aisavedrecipe_user_id' in plan('SELECT recipe_id, recipe_name FROM aisavedrecipe WHERE user_id = 1')
+        assert 'ix_uploaded_recipe_cuisine' in plan("SELECT id FROM uploaded_recipe WHERE cuisine IN ('Indian')")
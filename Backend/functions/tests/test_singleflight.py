@@ -0,0 +1,37 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from RecipePackage.Airecipe import airecipe
+
+BURST = 12
+
+
+def burst(prompts):
+    """Calls get_gemini_response for every prompt at (nearly) the same moment."""
+    start = threading.Barrier(len(prompts))
+
+    def ask(prompt):
+        start.wait()
+        return airecipe.get_gemini_response(prompt)
+
+    with ThreadPoolExecutor(max_workers=len(prompts)) as pool:
+        return list(pool.map(ask, prompts))
+
+
+def test_identical_concurrent_prompts_make_one_upstream_call(gemini):
+    gemini.text = 'Recipe Name: Dal'
+    gemini.delay = 0.3
+
+    answers = burst(['How do I make dal?'] * BURST)
+
+    assert answers == ['Recipe Name: Dal'] * BURST
+    assert gemini.calls == 1
+    assert airecipe.gateway.inflight.stats()['coalesced'] == BURST - 1
+
+
+def test_different_prompts_are_not_coalesced(gemini):
+    gemini.delay = 0.1
+
+    burst([f'Prompt {i % 3}' for i in range(6)])
+
+    assert gemini.calls == 3
@@ -35,6 +35,7 @@ const Airecipe = () => {
   const [recipe, setRecipe] = useState(null);
   const [loading, setLoading] = useState(false);
   const [saved, setSaved] = useState(false);
+  const [error, setError] = useState(null);
 
   const handleChange = (e) => {
     setAnswers({ ...answers, [questions[step].name]: e.target.value });
@@ -49,16 +50,47 @@ const Airecipe = () => {
     setLoading(true);
     setRecipe(null);
     setSaved(false);
+    setError(null);
 
     try {
-      const res = await axios.post('https://find-my-recipe-backend.web.app/airecipe/ai-recipe-qusn', answers);
-      if (res.data.status && res.data.answer) {
-        setRecipe(res.data.answer);
-      } else {
-        console.error("Invalid AI response", res.data);
+      // Streamed as Server-Sent Events: each field shows up as soon as it is generated
+      const res = await fetch('https://find-my-recipe-backend.web.app/airecipe/ai-recipe-qusn?stream=1', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+        body: JSON.stringify(answers),
+      });
+      // Errors (400/429/503...) come back as a JSON body, not as an event stream
+      if (!res.ok) {
+        const body = await res.json().catch(() => ({}));
+        throw new Error(body.error || `Request failed (${res.status})`);
+      }
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+        for (const raw of events) {
+          const event = (raw.match(/^event: (.*)$/m) || [])[1];
+          const data = JSON.parse((raw.match(/^data: (.*)$/m) || [])[1] || 'null');
+          if (event === 'field') {
+            setRecipe((prev) => ({ ...prev, [data.key]: data.value }));
+          } else if (event === 'done') {
+            setRecipe(data.answer);
+          } else if (event === 'error') {
+            console.error("Invalid AI response", data);
+            setError(data.error || "Could not generate a recipe");
+          }
+        }
       }
     } catch (err) {
       console.error("Error generating recipe:", err);
+      setError(err.message || "Could not generate a recipe");
     }
 
     setLoading(false);
@@ -101,30 +133,37 @@ const Airecipe = () => {
           >
             {step === questions.length - 1 ? (loading ? "Generating..." : "Generate Recipe") : "Next"}
           </button>
+          {error && <p className="mt-4 text-center text-red-600 font-semibold">{error}</p>}
         </div>
       )}
 
       {recipe && (
         <div className="w-full max-w-3xl mt-10 bg-white p-6 rounded-lg shadow-xl">
           <h2 className="text-3xl font-bold text-orange-700 mb-4">{recipe.name}</h2>
-          <p className="mb-3 text-sm text-gray-500">⏱️ Prep Time: {recipe.prep_time} mins</p>
+          {recipe.prep_time && (
+            <p className="mb-3 text-sm text-gray-500">⏱️ Prep Time: {recipe.prep_time} mins</p>
+          )}
 
           <h3 className="text-lg font-semibold text-gray-800 mt-4 mb-2">🧂 Ingredients</h3>
           <ul className="list-disc list-inside text-gray-700 space-y-1">
-            {recipe.ingredients.map((ing, i) => (
+            {(recipe.ingredients || []).map((ing, i) => (
               <li key={i}>{ing}</li>
             ))}
           </ul>
 
           <h3 className="text-lg font-semibold text-gray-800 mt-6 mb-2">👨‍🍳 Steps</h3>
           <ol className="list-decimal list-inside text-gray-700 space-y-1">
-            {recipe.steps.map((step, i) => (
+            {(recipe.steps || []).map((step, i) => (
               <li key={i}>{step}</li>
             ))}
           </ol>
 
+          {loading && <p className="mt-4 text-sm text-gray-500">Generating...</p>}
+          {error && <p className="mt-4 text-sm text-red-600 font-semibold">{error}</p>}
+
           <button
             onClick={saveRecipe}
+            disabled={loading}
             className="mt-6 bg-green-600 text-white px-6 py-2 rounded-md hover:bg-green-700"
           >
             {saved ? "✅ Saved" : "Save Recipe"}
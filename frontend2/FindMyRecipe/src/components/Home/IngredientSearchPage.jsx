@@ -1,7 +1,7 @@
 import React, { useState } from 'react';
 import axios from 'axios';
 import { useNavigate, Link } from 'react-router-dom';
-import CreatableSelect from 'react-select/creatable';
+import AsyncCreatableSelect from 'react-select/async-creatable';
 import { motion } from 'framer-motion';
 
 // --- Reusable UI Components (for Presentation) ---
@@ -72,6 +72,20 @@ const IngredientSearchPage = () => {
     setLoading(false);
   };
 
+  // Ask the backend typeahead for completions instead of shipping the whole catalogue
+  const loadIngredientOptions = async (inputValue) => {
+    if (!inputValue.trim()) return [];
+    try {
+      const res = await axios.get('https://find-my-recipe-backend.web.app/recipes/suggest', {
+        params: { prefix: inputValue, type: 'ingredient', limit: 10 },
+      });
+      return (res.data.ingredients || []).map(name => ({ value: name, label: name }));
+    } catch (err) {
+      console.error("Suggest error:", err);
+      return [];
+    }
+  };
+
   // Custom styles for react-select to match the light theme
   const selectStyles = {
     control: (styles) => ({ ...styles, backgroundColor: 'white', borderColor: '#D1D5DB', minHeight: '56px', boxShadow: 'none', '&:hover': { borderColor: '#F97316' } }),
@@ -103,8 +117,10 @@ const IngredientSearchPage = () => {
             className="w-full max-w-2xl mt-8 mx-auto"
             initial={{ opacity: 0, y: 20 }} animate={{ opacity: 1, y: 0 }} transition={{ duration: 0.5, delay: 0.2 }}
         >
-            <CreatableSelect 
+            <AsyncCreatableSelect 
                 isMulti 
+                cacheOptions
+                loadOptions={loadIngredientOptions}
                 value={ingredients}
                 onChange={setIngredients}
                 placeholder="Type ingredients you have and press enter..."
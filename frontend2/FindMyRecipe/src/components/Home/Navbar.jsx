@@ -28,11 +28,12 @@ const Navbar = () => {
       });
 
       if (res.data && res.data.user) {
-        const { name, email, image } = res.data.user;
+        const { name, email, image, thumbnail } = res.data.user;
         setUserInfo({ name, email });
 
-        if (image?.startsWith('data:image')) {
-          setProfileImg(image);
+        // The navbar only needs the small avatar the backend serves as a thumbnail
+        if (thumbnail || image?.startsWith('data:image') || image?.startsWith('http')) {
+          setProfileImg(thumbnail || image);
         } else if (image) {
           setProfileImg(`https://find-my-recipe-backend.web.app/${image}`);
         } else {
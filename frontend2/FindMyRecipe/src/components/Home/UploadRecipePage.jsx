@@ -1,9 +1,11 @@
-import React, { useState, useEffect } from 'react';
+import React, { useCallback, useEffect, useState } from 'react';
 import axios from 'axios';
 import { useNavigate, Link } from 'react-router-dom';
 import CreatableSelect from 'react-select/creatable';
 import { motion, AnimatePresence } from 'framer-motion';
 
+const PAGE_SIZE = 24;
+
 // --- Helper Component for Input Fields ---
 const InputField = ({ label, ...props }) => (
     <div>
@@ -71,24 +73,57 @@ const UploadRecipePage = () => {
   // State for VIEWING RECIPES
   const [myRecipes, setMyRecipes] = useState([]);
   const [listLoading, setListLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // null once the last page has been loaded
+  const [nextCursor, setNextCursor] = useState(undefined);
+  // Callback ref: the list (and the sentinel under it) mounts only after the tab switch animation
+  const [sentinel, setSentinel] = useState(null);
 
   const navigate = useNavigate();
 
-  const fetchMyRecipes = async () => {
+  const fetchPage = useCallback(async (cursor) => {
+    const params = { limit: PAGE_SIZE };
+    if (cursor) params.cursor = cursor;
+    const res = await axios.get("https://find-my-recipe-backend.web.app/recipes/api/recipes", { params });
+    const recipes = Array.isArray(res.data.recipes) ? res.data.recipes : [];
+    setMyRecipes((prev) => (cursor ? [...prev, ...recipes] : recipes));
+    setNextCursor(res.data.next_cursor);
+  }, []);
+
+  // First page only; the rest is loaded as the list is scrolled
+  const fetchMyRecipes = useCallback(async () => {
     setListLoading(true);
     try {
-      const res = await axios.get("https://find-my-recipe-backend.web.app/recipes/api/recipes");
-      setMyRecipes(Array.isArray(res.data) ? res.data : []);
+      await fetchPage();
     } catch (error) {
       console.error("Failed to fetch recipes:", error);
     } finally {
       setListLoading(false);
     }
-  };
+  }, [fetchPage]);
 
   useEffect(() => {
     fetchMyRecipes();
-  }, []);
+  }, [fetchMyRecipes]);
+
+  // Infinite scroll: load the next page when the sentinel below the grid comes into view
+  useEffect(() => {
+    if (!nextCursor || loadingMore || !sentinel) return;
+    const observer = new IntersectionObserver(async ([entry]) => {
+      if (!entry.isIntersecting) return;
+      observer.disconnect();
+      setLoadingMore(true);
+      try {
+        await fetchPage(nextCursor);
+      } catch (error) {
+        console.error("Failed to fetch recipes:", error);
+      } finally {
+        setLoadingMore(false);
+      }
+    }, { rootMargin: '300px' });
+    observer.observe(sentinel);
+    return () => observer.disconnect();
+  }, [sentinel, nextCursor, loadingMore, fetchPage]);
 
   // Functions for UPLOAD FORM
   const handleChange = (e) => setFormData(prev => ({ ...prev, [e.target.name]: e.target.value }));
@@ -127,7 +162,8 @@ const UploadRecipePage = () => {
   
   // Function for VIEWING RECIPES
   const handleCardClick = (recipe) => {
-    navigate(`/uploaded-recipes/${recipe.id}`, { state: { recipe } });
+    // Cards hold the list summary only; the details page fetches the full recipe
+    navigate(`/uploaded-recipes/${recipe.id}`);
   };
   
   const formVariants = {
@@ -168,7 +204,7 @@ const UploadRecipePage = () => {
                     className={`px-6 py-3 text-lg font-semibold transition-colors duration-300 relative ${activeView === 'view' ? 'border-b-2 border-orange-500 text-orange-600' : 'text-gray-500 hover:text-gray-800'}`}
                 >
                     View My Recipes
-                    <span className="absolute top-2 -right-1 bg-orange-500 text-white text-xs font-bold rounded-full h-5 w-5 flex items-center justify-center">{myRecipes.length}</span>
+                    <span className="absolute top-2 -right-1 bg-orange-500 text-white text-xs font-bold rounded-full h-5 w-5 flex items-center justify-center">{myRecipes.length}{nextCursor ? '+' : ''}</span>
                 </button>
             </div>
 
@@ -234,6 +270,8 @@ const UploadRecipePage = () => {
                                 ))}
                             </motion.div>
                         )}
+                        <div ref={setSentinel} />
+                        {loadingMore && <p className="text-center text-gray-500 mt-6">Loading more...</p>}
                     </motion.div>
                 )}
             </AnimatePresence>
@@ -1,29 +1,54 @@
-import React, { useEffect, useState } from 'react';
+import React, { useCallback, useEffect, useRef, useState } from 'react';
 import axios from 'axios';
 import { useNavigate } from 'react-router-dom';
 
+const PAGE_SIZE = 24;
+
 const UploadedRecipesPage = () => {
   const [recipes, setRecipes] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // null once the last page has been loaded
+  const [nextCursor, setNextCursor] = useState(undefined);
+  const sentinelRef = useRef(null);
   const navigate = useNavigate();
 
+  const fetchPage = useCallback(async (cursor) => {
+    const params = { limit: PAGE_SIZE };
+    if (cursor) params.cursor = cursor;
+    const res = await axios.get("https://find-my-recipe-backend.web.app/recipes/api/recipes", { params });
+    setRecipes((prev) => (cursor ? [...prev, ...res.data.recipes] : res.data.recipes));
+    setNextCursor(res.data.next_cursor);
+  }, []);
+
   useEffect(() => {
-    const fetchRecipes = async () => {
+    fetchPage()
+      .catch((error) => console.error("Failed to fetch recipes:", error))
+      .finally(() => setLoading(false));
+  }, [fetchPage]);
+
+  // Infinite scroll: load the next page when the sentinel below the grid comes into view
+  useEffect(() => {
+    if (!nextCursor || loadingMore || !sentinelRef.current) return;
+    const observer = new IntersectionObserver(async ([entry]) => {
+      if (!entry.isIntersecting) return;
+      observer.disconnect();
+      setLoadingMore(true);
       try {
-        const res = await axios.get("https://find-my-recipe-backend.web.app/recipes/api/recipes");
-        setRecipes(res.data);
+        await fetchPage(nextCursor);
       } catch (error) {
         console.error("Failed to fetch recipes:", error);
       } finally {
-        setLoading(false);
+        setLoadingMore(false);
       }
-    };
-
-    fetchRecipes();
-  }, []);
+    }, { rootMargin: '300px' });
+    observer.observe(sentinelRef.current);
+    return () => observer.disconnect();
+  }, [nextCursor, loadingMore, fetchPage]);
 
   const handleCardClick = (recipe) => {
-    navigate(`/uploaded-recipes/${recipe.id}`, { state: { recipe } });
+    // The list only carries a summary; the details page loads the full recipe
+    navigate(`/uploaded-recipes/${recipe.id}`);
   };
 
   return (
@@ -74,6 +99,8 @@ const UploadedRecipesPage = () => {
             ))}
           </div>
         )}
+        <div ref={sentinelRef} />
+        {loadingMore && <p className="text-center text-gray-500 mt-6">Loading more...</p>}
       </div>
     </div>
   );